@@ -1,4 +1,5 @@
 import os
+import threading
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
 
@@ -13,15 +14,69 @@ if not MONGODB_URI:
 if not MONGODB_DB_NAME:
     raise RuntimeError("❌ MONGODB_DB_NAME is missing in .env")
 
-# Tạo client Motor
-client = AsyncIOMotorClient(
-    MONGODB_URI,
-    tls=True,
-    tlsAllowInvalidCertificates=False
-)
+# Client Motor tạo lazily, một lần cho mỗi process: client (connection pool,
+# monitor thread) không được dùng chung qua fork, nên worker gunicorn /
+# uvicorn --workers nào cũng tự tạo client của mình ở lần truy cập đầu tiên
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> AsyncIOMotorClient:
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = AsyncIOMotorClient(
+                    MONGODB_URI,
+                    tls=True,
+                    tlsAllowInvalidCertificates=False
+                )
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_db():
+    return get_client()[MONGODB_DB_NAME]
+
+
+def reset_client():
+    """
+    Drop this process's client. Called from the gunicorn post_fork hook so a
+    worker never touches a client inherited from the master (preload_app),
+    and on shutdown.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+class LazyCollection:
+    """
+    Module-level collection handle (`tasks_db = get_collection(...)`) that
+    resolves to the current process's client on every use.
+    """
+
+    __slots__ = ("name", "_client", "_collection")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._client = None
+        self._collection = None
+
+    def __getattr__(self, attr):
+        client = get_client()
+        if self._client is not client:
+            self._collection = client[MONGODB_DB_NAME][self.name]
+            self._client = client
+        return getattr(self._collection, attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self.name!r})"
 
-# Chọn DB
-db = client[MONGODB_DB_NAME]
 
 def get_collection(name: str):
-    return db[name]
+    return LazyCollection(name)
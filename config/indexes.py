@@ -0,0 +1,79 @@
+import logging
+from pymongo import ASCENDING, DESCENDING
+from config.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+# collection -> list of (keys, options)
+INDEXES = {
+    "collection_tasks": [
+        # export / list / stats theo group, sort theo created_at
+        ([("group_id", ASCENDING), ("created_at", ASCENDING)], {}),
+        # deadline scanner: chỉ index task chưa được báo của từng cửa sổ
+        ([("due_soon_notified", ASCENDING), ("due_at", ASCENDING)],
+         {"partialFilterExpression": {"due_soon_notified": False}}),
+        ([("overdue_notified", ASCENDING), ("due_at", ASCENDING)],
+         {"partialFilterExpression": {"overdue_notified": False}}),
+    ],
+    "collection_group_members": [
+        ([("group_id", ASCENDING), ("wallet_address", ASCENDING)], {}),
+        # GET /groups/mine
+        ([("wallet_address", ASCENDING), ("joined_at", DESCENDING)], {}),
+    ],
+    # $lookup từ group_members
+    "collection_groups": [([("group_id", ASCENDING)], {})],
+    # cascade delete / list theo task
+    "collection_task_comments": [([("task_id", ASCENDING)], {})],
+    "collection_task_attachments": [([("task_id", ASCENDING)], {})],
+    "collection_task_verifications": [
+        ([("task_id", ASCENDING)], {}),
+        # hàng đợi kiểm tra chữ ký (signature_valid = None)
+        ([("signature_valid", ASCENDING)], {}),
+        # anchoring: verification hợp lệ chưa anchor / theo batch
+        ([("anchor_batch_id", ASCENDING), ("signature_valid", ASCENDING)], {}),
+    ],
+    "collection_verification_anchors": [([("status", ASCENDING)], {})],
+    "collection_jobs": [
+        ([("type", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING)], {}),
+    ],
+    "collection_auth_challenges": [
+        ([("wallet_address", ASCENDING)], {"unique": True}),
+        # TTL: challenge hết hạn mà chưa dùng tự bị xoá
+        ([("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ],
+    # Idempotency-Key (_id = wallet|route|key): response lưu tới expires_at
+    "collection_idempotency_keys": [([("expires_at", ASCENDING)], {"expireAfterSeconds": 0})],
+    "collection_audit_logs": [
+        ([("user_id", ASCENDING), ("created_at", DESCENDING)], {}),
+        ([("action", ASCENDING), ("created_at", DESCENDING)], {}),
+        ([("target_id", ASCENDING), ("created_at", DESCENDING)], {}),
+        # rollup theo khoảng thời gian
+        ([("created_at", ASCENDING)], {}),
+    ],
+    "collection_audit_rollups_hourly": [
+        ([("user_id", ASCENDING), ("bucket", ASCENDING)], {}),
+        ([("action", ASCENDING), ("bucket", ASCENDING)], {}),
+        ([("bucket", ASCENDING)], {}),
+    ],
+    "collection_audit_rollups_daily": [
+        ([("user_id", ASCENDING), ("bucket", ASCENDING)], {}),
+        ([("action", ASCENDING), ("bucket", ASCENDING)], {}),
+        ([("bucket", ASCENDING)], {}),
+    ],
+    "collection_notifications": [
+        ([("wallet_address", ASCENDING), ("created_at", DESCENDING)], {}),
+        ([("dedupe_key", ASCENDING)], {"unique": True}),
+        ([("group_id", ASCENDING)], {}),
+    ],
+}
+
+
+async def ensure_indexes():
+    """Create the indexes the query paths rely on (idempotent)."""
+    for collection_name, indexes in INDEXES.items():
+        collection = get_collection(collection_name)
+        for keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except Exception as e:
+                logger.warning(f"Could not create index {keys} on {collection_name}: {e}")
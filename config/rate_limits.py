@@ -0,0 +1,42 @@
+# config/rate_limits.py
+"""
+Giới hạn request theo route — chỉnh ở đây, không rải trong code.
+
+Mỗi entry: (METHOD, path template) -> {"ip": Limit, "wallet": Limit}.
+"wallet" lấy từ JWT (route cần đăng nhập) hoặc field wallet_address trong
+body JSON (/auth/*). Route không có trong bảng thì không bị giới hạn.
+"""
+import os
+from utils.rate_limit import Limit
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+
+# Số proxy đứng trước app (Render = 1): IP client lấy từ X-Forwarded-For
+RATE_LIMIT_PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "0"))
+
+_AUTH_IP = Limit.per_minute(30)
+_WRITE_IP = Limit.per_minute(300, burst=100)
+_WRITE_WALLET = Limit.per_minute(120, burst=40)
+_WRITE = {"ip": _WRITE_IP, "wallet": _WRITE_WALLET}
+
+ROUTE_LIMITS = {
+    # Không cần auth + tốn CPU (recover chữ ký) → chặt nhất
+    ("POST", "/auth/challenge"): {"ip": _AUTH_IP, "wallet": Limit.per_minute(6, burst=3)},
+    ("POST", "/auth/verify"): {"ip": _AUTH_IP, "wallet": Limit.per_minute(10, burst=5)},
+
+    ("POST", "/tasks/"): _WRITE,
+    ("PUT", "/tasks/{task_id}"): _WRITE,
+    ("DELETE", "/tasks/{task_id}"): _WRITE,
+    ("POST", "/tasks/{task_id}/attachments"): _WRITE,
+    ("POST", "/tasks/{task_id}/verifications"): _WRITE,
+    ("POST", "/comments/"): _WRITE,
+    ("PUT", "/comments/{comment_id}"): _WRITE,
+    ("DELETE", "/comments/{comment_id}"): _WRITE,
+    ("POST", "/groups/"): _WRITE,
+    ("PUT", "/groups/{group_id}"): _WRITE,
+    ("DELETE", "/groups/{group_id}"): _WRITE,
+    ("POST", "/group-members/"): _WRITE,
+    ("POST", "/group-members/join"): _WRITE,
+    ("POST", "/community-challenges/"): _WRITE,
+    ("PUT", "/community-challenges/{challenge_id}"): _WRITE,
+}
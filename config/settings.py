@@ -5,3 +5,92 @@ load_dotenv()
 
 MONGODB_URI = os.getenv("MONGODB_URI")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME")
+
+# Export /groups/{group_id}/export: số document mỗi lần getMore từ Mongo
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# GET /groups/{group_id}/stats: cache kết quả aggregation (giây, 0 = tắt)
+GROUP_STATS_CACHE_TTL = float(os.getenv("GROUP_STATS_CACHE_TTL", "15"))
+
+# Deadline scanner (jobs/deadline_scanner.py)
+DEADLINE_SCAN_INTERVAL = float(os.getenv("DEADLINE_SCAN_INTERVAL", "60"))
+DEADLINE_SCAN_BATCH_SIZE = int(os.getenv("DEADLINE_SCAN_BATCH_SIZE", "500"))
+DUE_SOON_HOURS = float(os.getenv("DUE_SOON_HOURS", "24"))
+
+# Cascade delete khi xoá group (jobs/cascade_delete.py)
+CASCADE_POLL_INTERVAL = float(os.getenv("CASCADE_POLL_INTERVAL", "10"))
+CASCADE_BATCH_SIZE = int(os.getenv("CASCADE_BATCH_SIZE", "500"))
+CASCADE_THROTTLE_MS = int(os.getenv("CASCADE_THROTTLE_MS", "100"))
+CASCADE_LEASE_SECONDS = int(os.getenv("CASCADE_LEASE_SECONDS", "120"))
+
+# Đối soát attachment_count / verification_count trên task (giây)
+RECONCILE_COUNTERS_INTERVAL = float(os.getenv("RECONCILE_COUNTERS_INTERVAL", "3600"))
+
+# Auth challenge store: "mongo" (mặc định, dùng được khi chạy nhiều instance)
+# hoặc "memory" (1 process, không round trip DB)
+CHALLENGE_STORE = os.getenv("CHALLENGE_STORE", "mongo")
+CHALLENGE_TTL_SECONDS = int(os.getenv("CHALLENGE_TTL_SECONDS", "300"))
+
+# Kiểm tra chữ ký verification ở background (jobs/verification_pipeline.py)
+VERIFY_INTERVAL = float(os.getenv("VERIFY_INTERVAL", "10"))
+VERIFY_BATCH_SIZE = int(os.getenv("VERIFY_BATCH_SIZE", "500"))
+VERIFY_POOL_WORKERS = int(os.getenv("VERIFY_POOL_WORKERS", "0")) or None  # None = số CPU
+
+# Merkle anchoring verification (jobs/anchor_verifications.py)
+ANCHOR_INTERVAL = float(os.getenv("ANCHOR_INTERVAL", "600"))
+ANCHOR_MAX_LEAVES = int(os.getenv("ANCHOR_MAX_LEAVES", "5000"))
+
+# SSE /groups/{group_id}/events
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Rollup audit log theo giờ / ngày (jobs/audit_rollup.py)
+AUDIT_ROLLUP_INTERVAL = float(os.getenv("AUDIT_ROLLUP_INTERVAL", "300"))
+AUDIT_ROLLUP_LAG_SECONDS = int(os.getenv("AUDIT_ROLLUP_LAG_SECONDS", "120"))
+
+# Retention audit log: log cũ hơn N ngày chuyển sang file nén (jobs/audit_retention.py)
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "90"))
+# Archive là bản duy nhất sau khi xoá khỏi Mongo: đường dẫn tuyệt đối, có sẵn, trên disk bền.
+# Để trống thì job không archive và không xoá gì.
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "")
+AUDIT_ARCHIVE_CODEC = os.getenv("AUDIT_ARCHIVE_CODEC", "auto")  # auto | zstd | gzip
+AUDIT_ARCHIVE_INTERVAL = float(os.getenv("AUDIT_ARCHIVE_INTERVAL", "3600"))
+AUDIT_ARCHIVE_BATCH_SIZE = int(os.getenv("AUDIT_ARCHIVE_BATCH_SIZE", "1000"))
+
+# Cache GET /users/{wallet_address} (stale-while-revalidate, giây; TTL 0 = tắt)
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "30"))
+PROFILE_CACHE_STALE_SECONDS = float(os.getenv("PROFILE_CACHE_STALE_SECONDS", "300"))
+PROFILE_CACHE_MAXSIZE = int(os.getenv("PROFILE_CACHE_MAXSIZE", "10000"))
+
+# Cache quyền (group_id, wallet) → bitmask của dependencies/authz.py (giây, 0 = tắt)
+AUTHZ_CACHE_TTL = float(os.getenv("AUTHZ_CACHE_TTL", "30"))
+
+# Nén response (middleware/compression.py): br / zstd nếu có package, luôn có gzip
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") != "0"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+# Body trọn vẹn từ mức này (byte) được nén trong thread pool thay vì trên event loop
+COMPRESSION_THREAD_MIN_SIZE = int(os.getenv("COMPRESSION_THREAD_MIN_SIZE", str(64 * 1024)))
+# Cache body đã nén theo hash nội dung (byte, 0 = tắt)
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(16 * 1024 * 1024)))
+
+# Nhiều worker trên 1 máy: file lock chọn worker chạy job nền ("" = process nào cũng chạy)
+JOBS_LOCK_FILE = os.getenv("JOBS_LOCK_FILE", "")
+# Shutdown: thời gian chờ job nền chạy nốt batch đang dở (giây)
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "10"))
+
+# Logging (utils/log.py): level mặc định, override theo logger, sampling, json | text
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")      # vd. "jobs=WARNING,controllers.auth_controller=DEBUG"
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")  # vd. "uvicorn.access=0.1"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Idempotency-Key cho các create endpoint (middleware/idempotency.py)
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# Worker giữ key quá lâu (crash) → worker khác được tiếp quản sau N giây
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+# Duplicate đang chạy ở worker khác: chờ tối đa N giây rồi trả 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
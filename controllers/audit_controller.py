@@ -0,0 +1,88 @@
+from fastapi import HTTPException
+from config.database import get_collection
+
+audit_logs_db = get_collection("collection_audit_logs")
+hourly_db = get_collection("collection_audit_rollups_hourly")
+daily_db = get_collection("collection_audit_rollups_daily")
+users_db = get_collection("collection_users")
+
+
+async def _scope_user_id(user: dict, user_id: str | None) -> str | None:
+    """Non-admins can only read their own audit trail."""
+    if user_id == user["user_id"]:
+        return user_id
+
+    account = await users_db.find_one({"_id": user["user_id"]}, {"roles": 1})
+    if account and "admin" in account.get("roles", []):
+        return user_id
+
+    if user_id is not None:
+        raise HTTPException(403, "Only admins can read other users' audit logs")
+    return user["user_id"]
+
+
+def _time_range(since: str | None, until: str | None) -> dict:
+    created = {}
+    if since:
+        created["$gte"] = since
+    if until:
+        created["$lt"] = until
+    return created
+
+
+# ------------------------------------------------------------
+# QUERY RAW LOGS
+# ------------------------------------------------------------
+
+async def query_logs(user: dict, user_id: str | None = None, action: str | None = None,
+                     target_id: str | None = None, since: str | None = None,
+                     until: str | None = None, before: str | None = None,
+                     limit: int = 100) -> list:
+    """
+    Filter by user / action / target and time range, newest first. Each
+    filter combination is served by a (field, created_at) index; `before`
+    is the created_at of the last row of the previous page.
+    """
+    query = {}
+    scoped_user = await _scope_user_id(user, user_id)
+    if scoped_user:
+        query["user_id"] = scoped_user
+    if action:
+        query["action"] = action
+    if target_id:
+        query["target_id"] = target_id
+
+    created = _time_range(since, until)
+    if before:
+        created["$lt"] = min(before, created.get("$lt", before))
+    if created:
+        query["created_at"] = created
+
+    docs = await audit_logs_db.find(query).sort("created_at", -1).limit(limit).to_list(None)
+    for d in docs:
+        d["id"] = d.pop("_id")
+    return docs
+
+
+# ------------------------------------------------------------
+# ROLLUPS
+# ------------------------------------------------------------
+
+async def get_rollups(user: dict, granularity: str = "day", user_id: str | None = None,
+                      action: str | None = None, since: str | None = None,
+                      until: str | None = None, limit: int = 1000) -> list:
+    """Pre-aggregated counts per (user, action) from jobs/audit_rollup.py."""
+    collection = hourly_db if granularity == "hour" else daily_db
+
+    query = {}
+    scoped_user = await _scope_user_id(user, user_id)
+    if scoped_user:
+        query["user_id"] = scoped_user
+    if action:
+        query["action"] = action
+
+    bucket = _time_range(since, until)
+    if bucket:
+        query["bucket"] = bucket
+
+    return await collection.find(query, {"_id": 0}).sort("bucket", 1).limit(limit).to_list(None)
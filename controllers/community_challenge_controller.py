@@ -3,6 +3,7 @@ from datetime import datetime
 from fastapi import HTTPException
 from typing import Optional, List
 from config.database import get_collection
+from utils.writes import update_if_allowed
 
 challenges_db = get_collection("collection_community_challenges")
 
@@ -47,26 +48,26 @@ async def get_challenge(challenge_id: str) -> dict:
 # UPDATE
 # =======================================
 async def update_challenge(challenge_id: str, updates: dict, requester_wallet_address: str) -> dict:
-    challenge = await get_challenge(challenge_id)
-
-    if challenge["wallet_address"] != requester_wallet_address:
-        raise HTTPException(status_code=403, detail="Only owner can update challenge")
-
     # Xóa các field không được phép update
     protected = ["_id", "user_id", "wallet_address", "shared_at"]
     for key in protected:
         updates.pop(key, None)
 
     if not updates:
+        challenge = await get_challenge(challenge_id)
+        if challenge["wallet_address"] != requester_wallet_address:
+            raise HTTPException(status_code=403, detail="Only owner can update challenge")
         return challenge
 
-    await challenges_db.update_one(
+    return await update_if_allowed(
+        challenges_db,
         {"_id": challenge_id},
-        {"$set": updates}
+        {"wallet_address": requester_wallet_address},
+        {"$set": updates},
+        not_found="Challenge not found",
+        forbidden="Only owner can update challenge",
     )
 
-    return await get_challenge(challenge_id)
-
 
 # =======================================
 # DELETE
@@ -4,6 +4,11 @@ from datetime import datetime
 from fastapi import HTTPException
 from typing import Optional, List
 from config.database import get_collection
+from jobs.cascade_delete import enqueue_group_cascade
+from controllers.user_controller import invalidate_group_profiles
+from dependencies import authz
+from dependencies.authz import Perm, ensure, groups_with
+from utils.writes import update_if_allowed
 
 groups_db = get_collection("collection_groups")
 group_members_db = get_collection("collection_group_members")
@@ -29,6 +34,10 @@ async def create_group(data: dict, user_id: str, wallet_address: str) -> dict:
         "wallet_address": wallet_address,
         "created_at": now,
         "updated_at": now,
+        # Counter denormalize: chỉ thay đổi bằng $inc (inc_group_counters)
+        "member_count": 1,
+        "task_count": 0,
+        "open_task_count": 0,
         **data
     }
 
@@ -44,11 +53,11 @@ async def create_group(data: dict, user_id: str, wallet_address: str) -> dict:
         "_id": f"mem_{uuid.uuid4().hex}",
         "group_id": group_id,
         "user_id": user_id,
-        "wallet_address": wallet_address,
+        "wallet_address": wallet_address.lower(),
         "role": "owner",
         "joined_at": now,
         "last_active_at": now,
-        "permissions": ["*"]
+        "permissions": authz.permission_names("owner")
     }
 
     await group_members_db.update_one(
@@ -71,43 +80,61 @@ async def get_group(group_id: str) -> dict:
 
 
 # ------------------------------
-# UPDATE GROUP
+# GROUP COUNTERS
 # ------------------------------
-async def update_group(group_id: str, updates: dict, requester_wallet_address: str) -> dict:
-    group = await get_group(group_id)
+async def inc_group_counters(group_id: str | None, **deltas: int):
+    """$inc member_count / task_count / open_task_count; zero deltas are skipped."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if group_id and deltas:
+        await groups_db.update_one({"group_id": group_id}, {"$inc": deltas})
 
-    if group["wallet_address"] != requester_wallet_address:
-        raise HTTPException(status_code=403, detail="Only owner can update group")
 
+# ------------------------------
+# UPDATE GROUP
+# ------------------------------
+async def update_group(group_id: str, updates: dict, user: dict) -> dict:
     updates["updated_at"] = _format_datetime(datetime.utcnow())
 
-    await groups_db.update_one(
+    async def recheck(_group: dict):
+        await ensure(group_id, user, Perm.UPDATE_GROUP, "Only owner can update group")
+
+    group = await update_if_allowed(
+        groups_db,
         {"group_id": group_id},
-        {"$set": updates}
+        {"group_id": {"$in": await groups_with(user, Perm.UPDATE_GROUP)}},
+        {"$set": updates},
+        not_found="Group not found",
+        recheck=recheck,
     )
+    invalidate_group_profiles(group_id)
 
-    return await get_group(group_id)
+    return group
 
 
 # ------------------------------
 # DELETE GROUP
 # ------------------------------
-async def delete_group(group_id: str, requester_wallet_address: str) -> dict:
-    group = await get_group(group_id)
+async def delete_group(group_id: str, user: dict) -> dict:
+    await get_group(group_id)
+    await ensure(group_id, user, Perm.DELETE_GROUP, "Only owner can delete group")
 
-    if group["wallet_address"] != requester_wallet_address:
-        raise HTTPException(status_code=403, detail="Only owner can delete group")
+    # Job trước: process chết ở bất kỳ bước nào sau đây thì job vẫn xoá nốt
+    # group, member và task / comment / attachment / verification ở background
+    job = await enqueue_group_cascade(group_id, user["wallet_address"])
 
     await groups_db.delete_one({"group_id": group_id})
     await group_members_db.delete_many({"group_id": group_id})
+    authz.invalidate(group_id)
+    invalidate_group_profiles(group_id)
 
-    return {"status": "deleted", "group_id": group_id}
+    return {"status": "deleted", "group_id": group_id, "cascade_job_id": job["_id"]}
 
 
 # ------------------------------
 # LIST GROUPS
 # ------------------------------
-async def list_groups(wallet_address: Optional[str] = None, is_public: Optional[bool] = None) -> list:
+async def list_groups(wallet_address: Optional[str] = None, is_public: Optional[bool] = None,
+                      projection: Optional[dict] = None) -> list:
     query = {}
 
     if wallet_address:
@@ -116,7 +143,7 @@ async def list_groups(wallet_address: Optional[str] = None, is_public: Optional[
     if is_public is not None:
         query["is_public"] = is_public
 
-    groups = await groups_db.find(query).to_list(None)
+    groups = await groups_db.find(query, projection).to_list(None)
     return groups
 
 
@@ -124,7 +151,8 @@ async def list_groups(wallet_address: Optional[str] = None, is_public: Optional[
 # LIST GROUPS MULTI OWNER
 # ------------------------------
 async def list_groups_multi(wallet_addresses: Optional[List[str]] = None,
-                            is_public: Optional[bool] = None) -> list:
+                            is_public: Optional[bool] = None,
+                            projection: Optional[dict] = None) -> list:
     
     query = {}
 
@@ -134,5 +162,44 @@ async def list_groups_multi(wallet_addresses: Optional[List[str]] = None,
     if is_public is not None:
         query["is_public"] = is_public
 
-    groups = await groups_db.find(query).to_list(None)
+    groups = await groups_db.find(query, projection).to_list(None)
     return groups
+
+
+# ------------------------------
+# GROUPS OF A MEMBER
+# ------------------------------
+def _my_groups_pipeline(wallet_address: str, skip: int = 0, limit: int | None = None,
+                        projection: dict | None = None) -> list:
+    """
+    collection_group_members (theo wallet) join sang collection_groups, kèm
+    role của user; member_count / task_count đã nằm sẵn trên group document.
+    """
+    pipeline = [
+        {"$match": {"wallet_address": wallet_address.lower()}},
+        {"$sort": {"joined_at": -1, "_id": 1}},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+
+    return pipeline + [
+        {"$lookup": {
+            "from": "collection_groups",
+            "localField": "group_id",
+            "foreignField": "group_id",
+            "as": "group",
+        }},
+        # membership của group đã xoá (cascade chưa chạy xong) bị bỏ qua
+        {"$unwind": "$group"},
+        {"$set": {"group.role": "$role", "group.joined_at": "$joined_at"}},
+        {"$replaceRoot": {"newRoot": "$group"}},
+    ] + ([{"$project": projection}] if projection else [])
+
+
+async def list_my_groups(wallet_address: str, skip: int = 0, limit: int = 50,
+                         projection: dict | None = None) -> list:
+    pipeline = _my_groups_pipeline(wallet_address, skip, limit, projection)
+    return await group_members_db.aggregate(pipeline).to_list(None)
+
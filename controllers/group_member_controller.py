@@ -1,20 +1,19 @@
 # controllers/group_member_controller.py
 import uuid
 from datetime import datetime
-from fastapi import HTTPException, Request
+from fastapi import HTTPException
 from typing import List
 import logging
 
 from config.database import get_collection
+from controllers.user_controller import invalidate_profiles
+from dependencies import authz
+from dependencies.authz import Perm, ensure
+from utils.writes import update_if_allowed
 
 members_db = get_collection("collection_group_members")
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler()
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 
 def _format_datetime(dt: datetime) -> str:
@@ -24,37 +23,26 @@ def _format_datetime(dt: datetime) -> str:
         return dt.isoformat().replace("+00:00", "Z")
 
 
-def _get_permissions(role: str) -> List[str]:
-    if role == "owner":
-        return ["*"]
-
-    if role == "admin":
-        return [
-            "create_task", "edit_task", "delete_task", "assign_task",
-            "invite_member", "remove_member", "update_group_info",
-            "change_role", "view_task", "create_announcement",
-            "pin_task", "archive_task"
-        ]
-
-    if role == "member":
-        return ["create_task", "edit_task", "view_task", "assign_task"]
-
-    if role == "guest":
-        return ["view_task"]
-
-    return ["view_task"]
+def _require_owner_for(role: str | None, mask: Perm):
+    """Chỉ owner mới được trao / thay đổi role owner."""
+    if role == "owner" and mask != authz.ALL:
+        raise HTTPException(status_code=403, detail="Only owner can manage the owner role")
 
 
 # ----------------------------------------------------------------
 # ADD MEMBER
 # ----------------------------------------------------------------
-async def add_member(data: dict) -> dict:
+async def add_member(data: dict, current_user: dict) -> dict:
     # Avoid circular import
-    from controllers.group_controller import get_group
+    from controllers.group_controller import get_group, inc_group_counters
 
     group = await get_group(data["group_id"])
     role = data.get("role", "member")
 
+    mask = await ensure(data["group_id"], current_user, Perm.INVITE_MEMBER,
+                        "You don't have permission to add members")
+    _require_owner_for(role, mask)
+
     joined_at = (
         group["created_at"] if role == "owner"
         else _format_datetime(datetime.utcnow())
@@ -72,7 +60,7 @@ async def add_member(data: dict) -> dict:
         "role": role,
         "joined_at": joined_at,
         "last_active_at": _format_datetime(datetime.utcnow()),
-        "permissions": _get_permissions(role),
+        "permissions": authz.permission_names(role),
     }
 
     await members_db.update_one(
@@ -80,6 +68,9 @@ async def add_member(data: dict) -> dict:
         {"$set": member_doc},
         upsert=True
     )
+    await inc_group_counters(member_doc["group_id"], member_count=1)
+    authz.invalidate(member_doc["group_id"], member_doc["wallet_address"])
+    invalidate_profiles(member_doc["wallet_address"])
 
     return member_doc
 
@@ -88,7 +79,7 @@ async def add_member(data: dict) -> dict:
 # JOIN PUBLIC GROUP
 # ----------------------------------------------------------------
 async def join_group(data: dict) -> dict:
-    from controllers.group_controller import get_group
+    from controllers.group_controller import get_group, inc_group_counters
 
     group = await get_group(data["group_id"])
 
@@ -105,7 +96,7 @@ async def join_group(data: dict) -> dict:
         "role": "guest",
         "joined_at": now,
         "last_active_at": now,
-        "permissions": _get_permissions("guest"),
+        "permissions": authz.permission_names("guest"),
     }
 
     await members_db.update_one(
@@ -113,6 +104,9 @@ async def join_group(data: dict) -> dict:
         {"$set": member_doc},
         upsert=True
     )
+    await inc_group_counters(member_doc["group_id"], member_count=1)
+    authz.invalidate(member_doc["group_id"], member_doc["wallet_address"])
+    invalidate_profiles(member_doc["wallet_address"])
 
     return member_doc
 
@@ -120,55 +114,75 @@ async def join_group(data: dict) -> dict:
 # ----------------------------------------------------------------
 # GET MEMBERS OF A GROUP
 # ----------------------------------------------------------------
-async def get_members(group_id: str, current_user: dict) -> List[dict]:
-    members = await members_db.find({"group_id": group_id}).to_list(None)
+async def get_members(group_id: str, current_user: dict, projection: dict | None = None) -> List[dict]:
+    members = await members_db.find({"group_id": group_id}, projection).to_list(None)
     return members
 
 
 # ----------------------------------------------------------------
 # UPDATE MEMBER BY WALLET
 # ----------------------------------------------------------------
-async def update_member_by_wallet(group_id: str, request: Request, updates: dict) -> dict:
-    logger.debug(f"Incoming update for group_id={group_id}: {updates}")
-
-    wallet_address = request.query_params.get("wallet_address")
-    if not wallet_address:
-        raise HTTPException(status_code=400, detail="wallet_address is required in query parameters")
+async def update_member_by_wallet(group_id: str, wallet_address: str, updates: dict,
+                                  current_user: dict) -> dict:
+    logger.debug(f"Member update group_id={group_id} wallet={wallet_address} fields={sorted(updates)}")
 
     normalized_wallet = wallet_address.lower()
+    # Không cho đổi wallet của member
+    updates.pop("wallet_address", None)
 
-    member = await members_db.find_one({
-        "group_id": group_id,
-        "wallet_address": normalized_wallet
-    })
-
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found")
-
-    logger.debug(f"Found member: {member}")
+    mask = await ensure(group_id, current_user, Perm.CHANGE_ROLE,
+                        "You don't have permission to change member roles")
+    # Role owner của member hiện tại được kiểm tra trong filter
+    allowed = {}
+    if "role" in updates:
+        _require_owner_for(updates["role"], mask)
+        if mask != authz.ALL:
+            allowed = {"role": {"$ne": "owner"}}
 
     updates["last_active_at"] = _format_datetime(datetime.utcnow())
 
     if "role" in updates:
-        updates["permissions"] = _get_permissions(updates["role"])
-
-    await members_db.update_one(
-        {"_id": member["_id"]},
-        {"$set": updates}
+        updates["permissions"] = authz.permission_names(updates["role"])
+
+    updated_member = await update_if_allowed(
+        members_db,
+        {"group_id": group_id, "wallet_address": normalized_wallet},
+        allowed,
+        {"$set": updates},
+        not_found="Member not found",
+        forbidden="Only owner can manage the owner role",
     )
-
-    updated_member = await members_db.find_one({"_id": member["_id"]})
+    authz.invalidate(group_id, updated_member["wallet_address"])
+    invalidate_profiles(normalized_wallet)
     return updated_member
 
 
 # ----------------------------------------------------------------
 # REMOVE MEMBER
 # ----------------------------------------------------------------
-async def remove_member(member_id: str) -> dict:
-    result = await members_db.delete_one({"_id": member_id})
+async def remove_member(member_id: str, current_user: dict) -> dict:
+    from controllers.group_controller import inc_group_counters
 
-    if result.deleted_count == 0:
+    member = await members_db.find_one({"_id": member_id}, {"group_id": 1, "wallet_address": 1, "role": 1})
+    if member is None:
         raise HTTPException(status_code=404, detail="Member not found")
 
+    # Tự rời group thì không cần quyền remove_member
+    if member["wallet_address"] != current_user["wallet_address"].lower():
+        mask = await ensure(member["group_id"], current_user, Perm.REMOVE_MEMBER,
+                            "You don't have permission to remove members")
+        _require_owner_for(member.get("role"), mask)
+
+    member = await members_db.find_one_and_delete(
+        {"_id": member_id}, projection={"group_id": 1, "wallet_address": 1}
+    )
+
+    if member is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+
+    await inc_group_counters(member["group_id"], member_count=-1)
+    authz.invalidate(member["group_id"], member["wallet_address"])
+    invalidate_profiles(member.get("wallet_address"))
+
     return {"status": "deleted", "member_id": member_id}
 # ----------------------------------------------------------------
\ No newline at end of file
@@ -0,0 +1,20 @@
+from fastapi import HTTPException
+from config.database import get_collection
+
+jobs_db = get_collection("collection_jobs")
+
+
+# ------------------------------------------------------------
+# GET JOB STATUS
+# ------------------------------------------------------------
+
+async def get_job(job_id: str, user: dict) -> dict:
+    job = await jobs_db.find_one({"_id": job_id})
+    if not job:
+        raise HTTPException(404, "Job not found")
+
+    if job.get("requested_by") != user["wallet_address"]:
+        raise HTTPException(403, "Unauthorized")
+
+    job["job_id"] = job["_id"]
+    return job
@@ -0,0 +1,40 @@
+from fastapi import HTTPException
+from config.database import get_collection
+
+notifications_db = get_collection("collection_notifications")
+
+
+def _to_response(doc: dict) -> dict:
+    doc["id"] = doc["_id"]
+    return doc
+
+
+# ------------------------------------------------------------
+# LIST NOTIFICATIONS
+# ------------------------------------------------------------
+
+async def list_notifications(wallet_address: str, unread_only: bool = False,
+                             before: str | None = None, limit: int = 50) -> list:
+    query = {"wallet_address": wallet_address.lower()}
+    if unread_only:
+        query["read"] = False
+    if before:
+        query["created_at"] = {"$lt": before}
+
+    docs = await notifications_db.find(query).sort("created_at", -1).limit(limit).to_list(None)
+    return [_to_response(d) for d in docs]
+
+
+# ------------------------------------------------------------
+# MARK AS READ
+# ------------------------------------------------------------
+
+async def mark_read(notification_id: str, wallet_address: str) -> dict:
+    doc = await notifications_db.find_one_and_update(
+        {"_id": notification_id, "wallet_address": wallet_address.lower()},
+        {"$set": {"read": True}},
+        return_document=True,
+    )
+    if not doc:
+        raise HTTPException(404, "Notification not found")
+    return _to_response(doc)
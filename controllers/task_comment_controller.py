@@ -2,10 +2,12 @@ import uuid
 from datetime import datetime
 from fastapi import HTTPException, Request
 from config.database import get_collection
+from utils.event_hub import event_hub, group_channel
+from dependencies.authz import Perm, ensure, resolve
+from utils.writes import update_if_allowed
 
 tasks_db = get_collection("collection_tasks")
 comments_db = get_collection("collection_task_comments")
-group_members_db = get_collection("collection_group_members")
 audit_logs_db = get_collection("collection_audit_logs")
 
 
@@ -36,6 +38,21 @@ async def log_action(request: Request, user_id: str, wallet_address: str,
     await audit_logs_db.insert_one(log_doc)
 
 
+async def _publish_comment_event(kind: str, comment: dict):
+    """Notify live group boards (SSE); only comments on group tasks have a channel."""
+    if not comment.get("group_id"):
+        return
+    event = {
+        "type": f"comment.{kind}",
+        "key": f"comment:{comment['_id']}",
+        "task_id": comment["task_id"],
+        "comment_id": comment["_id"],
+    }
+    if kind != "deleted":
+        event["comment"] = {k: v for k, v in comment.items() if k != "_id"}
+    await event_hub.publish(group_channel(comment["group_id"]), event)
+
+
 # =========================================
 # 🔵 CREATE COMMENT
 # =========================================
@@ -47,12 +64,7 @@ async def create_comment(data: dict, request: Request, user: dict):
 
     # Nếu là group task
     if task.get("group_id"):
-        member = await group_members_db.find_one({
-            "wallet_address": user["wallet_address"],
-            "group_id": task["group_id"]
-        })
-        if not member:
-            raise HTTPException(403, "Not a member of this group")
+        await ensure(task["group_id"], user, Perm.COMMENT)
 
     else:
         # Personal task → chỉ chính chủ mới được comment
@@ -65,6 +77,7 @@ async def create_comment(data: dict, request: Request, user: dict):
     comment = {
         "_id": comment_id,
         "task_id": task["task_id"],
+        "group_id": task.get("group_id"),
         "user_id": user["user_id"],
         "wallet_address": user["wallet_address"],
         "content": data.get("content"),
@@ -76,6 +89,7 @@ async def create_comment(data: dict, request: Request, user: dict):
 
     await comments_db.insert_one(comment)
     await log_action(request, user["user_id"], user["wallet_address"], "create_comment", comment_id)
+    await _publish_comment_event("created", comment)
 
     return comment
 
@@ -105,23 +119,25 @@ async def get_comment(comment_id: str):
 # =========================================
 
 async def update_comment(comment_id: str, updates: dict, request: Request, user: dict):
-    comment = await comments_db.find_one({"_id": comment_id})
-    if not comment:
-        raise HTTPException(404, "Comment not found")
-
-    if comment["user_id"] != user["user_id"]:
-        raise HTTPException(403, "Only author can edit comment")
-
     new_data = {
-        "content": updates.get("content", comment["content"]),
         "updated_at": _format_datetime(datetime.utcnow()),
         "is_edited": True,
     }
-
-    await comments_db.update_one({"_id": comment_id}, {"$set": new_data})
-    updated_comment = await comments_db.find_one({"_id": comment_id})
+    if updates.get("content") is not None:
+        new_data["content"] = updates["content"]
+
+    # Chỉ tác giả: điều kiện nằm trong filter
+    updated_comment = await update_if_allowed(
+        comments_db,
+        {"_id": comment_id},
+        {"user_id": user["user_id"]},
+        {"$set": new_data},
+        not_found="Comment not found",
+        forbidden="Only author can edit comment",
+    )
 
     await log_action(request, user["user_id"], user["wallet_address"], "update_comment", comment_id)
+    await _publish_comment_event("updated", updated_comment)
 
     return updated_comment
 
@@ -146,12 +162,7 @@ async def delete_comment(comment_id: str, request: Request, user: dict):
         can_delete = True
 
     elif task.get("group_id"):
-        member = await group_members_db.find_one({
-            "wallet_address": user["wallet_address"],
-            "group_id": task["group_id"]
-        })
-
-        if member and member.get("role") == "owner":
+        if await resolve(task["group_id"], user) & Perm.DELETE_ANY_COMMENT:
             can_delete = True
 
     if not can_delete:
@@ -160,5 +171,6 @@ async def delete_comment(comment_id: str, request: Request, user: dict):
     await comments_db.delete_one({"_id": comment_id})
 
     await log_action(request, user["user_id"], user["wallet_address"], "delete_comment", comment_id)
+    await _publish_comment_event("deleted", {**comment, "group_id": task.get("group_id")})
 
     return {"status": "deleted", "comment_id": comment_id}
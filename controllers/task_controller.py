@@ -1,15 +1,24 @@
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import HTTPException, Request
-from models.task import TaskCreate, TaskUpdate
+from models.task import TaskCreate, TaskUpdate, TaskMetadata
 from config.database import get_collection
+from config.settings import EXPORT_BATCH_SIZE, GROUP_STATS_CACHE_TTL, SSE_HEARTBEAT_SECONDS
+from utils.streaming import ndjson_stream, csv_stream, gzip_stream, prefetch
+from utils.ttl_cache import TTLCache
+from jobs.verification_pipeline import verify_documents, store_results
+from utils.event_hub import event_hub, group_channel, sse_stream
+from controllers.user_controller import invalidate_group_profiles
+from controllers.group_controller import inc_group_counters
+from dependencies.authz import Perm, ensure, resolve, groups_with
+from utils.writes import update_if_allowed
 
 tasks_db = get_collection("collection_tasks")
 audit_logs_db = get_collection("collection_audit_logs")
-group_members_db = get_collection("collection_group_members")
 task_attachments_db = get_collection("collection_task_attachments")
 task_verifications_db = get_collection("collection_task_verifications")
 users_db = get_collection("collection_users")
+anchors_db = get_collection("collection_verification_anchors")
 
 
 # ------------------------------------------------------------
@@ -23,7 +32,50 @@ def _format_datetime(dt: datetime) -> str:
         return dt.isoformat().replace("+00:00", "Z")
 
 
+PRIORITY_COLORS = {
+    "high": "#ef4444",
+    "medium": "#f59e0b",
+    "low": "#10b981",
+}
+DEFAULT_COLOR = "#6b7280"
+
+# Counter denormalize, chỉ được thay đổi bằng $inc (add_attachment / add_verification)
+# hoặc bởi jobs/reconcile_task_counters.py
+COUNTER_FIELDS = (
+    "attachment_count", "attachment_counts_by_user",
+    "verification_count", "verification_counts_by_user",
+)
+
+# Các field trả về cho client — đọc thẳng từ DB, không tính lại
+TASK_PROJECTION = {
+    "_id": 0,
+    "task_id": 1, "title": 1, "description": 1, "status": 1, "priority": 1,
+    "tags": 1, "due_date": 1, "metadata": 1,
+    "user_id": 1, "wallet_address": 1, "group_id": 1,
+    "is_completed": 1, "color_code": 1,
+    "created_at": 1, "updated_at": 1, "completed_at": 1, "version": 1,
+}
+
+
+def _to_utc_naive(value) -> datetime | None:
+    """Parse a stored due_date (ISO string or datetime) into naive UTC."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 def _calculate_fields(task: dict) -> dict:
+    """
+    Compute derived fields. Only called on write — the stored document is
+    what reads return.
+    """
     now = _format_datetime(datetime.utcnow())
 
     if "created_at" not in task:
@@ -38,15 +90,68 @@ def _calculate_fields(task: dict) -> dict:
         task["completed_at"] = None
 
     priority = task.get("priority", "medium")
-    task["color_code"] = {
-        "high": "#ef4444",
-        "medium": "#f59e0b",
-        "low": "#10b981",
-    }.get(priority, "#6b7280")
+    task["color_code"] = PRIORITY_COLORS.get(priority, DEFAULT_COLOR)
+
+    # due_at: bản BSON date của due_date, để deadline scanner query theo range (index)
+    due_at = _to_utc_naive(task.get("due_date"))
+    if isinstance(task.get("due_date"), datetime):
+        task["due_date"] = _format_datetime(task["due_date"])
+    task["due_at"] = due_at
 
     return task
 
 
+def _assigns_other(data: dict, user: dict) -> bool:
+    wallet = data.get("wallet_address")
+    return (
+        (wallet is not None and wallet.lower() != user["wallet_address"].lower())
+        or data.get("user_id") not in (None, user["user_id"])
+    )
+
+
+async def _count_submission(task_id: str, user: dict, kind: str) -> dict:
+    """
+    $inc counter attachment / verification trên task; quyền submit_work của
+    group task nằm trong filter (task cá nhân không giới hạn).
+    """
+    async def recheck(task: dict):
+        if task.get("group_id"):
+            await ensure(task["group_id"], user, Perm.SUBMIT_WORK,
+                         "You don't have permission to submit work for this task")
+
+    return await update_if_allowed(
+        tasks_db,
+        {"task_id": task_id},
+        {"$or": [
+            {"group_id": {"$in": await groups_with(user, Perm.SUBMIT_WORK)}},
+            {"group_id": {"$in": [None, ""]}},
+        ]},
+        {"$inc": {
+            f"{kind}_count": 1,
+            f"{kind}_counts_by_user.{user['user_id']}": 1,
+        }},
+        not_found="Task not found",
+        recheck=recheck,
+        projection={"group_id": 1},
+        probe_projection={"group_id": 1},
+    )
+
+
+def _is_open(task: dict) -> bool:
+    # giống OPEN_TASK của jobs/deadline_scanner.py
+    return not task.get("is_completed") and task.get("status") != "archived"
+
+
+async def _publish_task_event(kind: str, task: dict):
+    """Notify live group boards (SSE) after a write; personal tasks have no channel."""
+    if not task.get("group_id"):
+        return
+    event = {"type": f"task.{kind}", "key": f"task:{task['task_id']}", "task_id": task["task_id"]}
+    if kind != "deleted":
+        event["task"] = {k: task.get(k) for k in TASK_PROJECTION if k != "_id"}
+    await event_hub.publish(group_channel(task["group_id"]), event)
+
+
 async def log_action(request: Request, user_id: str, wallet_address: str,
                      action: str, target_id: str | None = None):
 
@@ -80,32 +185,39 @@ async def create_task(data: TaskCreate, request: Request, user: dict):
 
     # Group task
     if data_dict.get("group_id"):
-        member = await group_members_db.find_one({
-            "wallet_address": user["wallet_address"],
-            "group_id": data_dict["group_id"]
-        })
-
-        if not member:
-            raise HTTPException(403, "Not a member of this group")
-
-        if member["role"] not in ["owner", "admin"]:
-            raise HTTPException(403, "You don't have permission to create group tasks")
+        mask = await ensure(data_dict["group_id"], user, Perm.CREATE_TASK,
+                            "You don't have permission to create group tasks")
+        # wallet_address / user_id của group task là người được giao
+        if _assigns_other(data_dict, user) and not mask & Perm.ASSIGN_TASK:
+            raise HTTPException(403, "You don't have permission to assign group tasks")
 
     else:
         if not data_dict.get("user_id") or not data_dict.get("wallet_address"):
             raise HTTPException(400, "user_id and wallet_address required for personal tasks")
 
+    # metadata luôn là object để update được từng key (metadata.*)
+    if data_dict.get("metadata") is None:
+        data_dict["metadata"] = {}
+
     task_id = f"task_{uuid.uuid4().hex}"
     task = {
         "_id": uuid.uuid4().hex,
         "task_id": task_id,
         **data_dict,
+        # Tăng mỗi lần update_task; client gửi lại để phát hiện ghi đè (409)
+        "version": 1,
+        # jobs/deadline_scanner.py đặt True sau khi gửi notification
+        "due_soon_notified": False,
+        "overdue_notified": False,
     }
 
     task = _calculate_fields(task)
 
     await tasks_db.insert_one(task)
+    await inc_group_counters(task.get("group_id"), task_count=1, open_task_count=int(_is_open(task)))
     await log_action(request, user["user_id"], user["wallet_address"], "create_task", task_id)
+    await _publish_task_event("created", task)
+    invalidate_group_profiles(task.get("group_id"))
 
     return task
 
@@ -125,10 +237,17 @@ async def get_task(task_id: str):
 # LIST TASKS
 # ------------------------------------------------------------
 
-async def list_tasks(wallet_address: str | None = None,
-                     user_id: str | None = None,
-                     group_id: str | None = None):
-
+def list_tasks(wallet_address: str | None = None,
+               user_id: str | None = None,
+               group_id: str | None = None,
+               batch_size: int = 500,
+               projection: dict | None = None):
+    """
+    Return a cursor over the matching tasks. Derived fields are persisted on
+    write (see scripts/backfill_task_fields.py for older documents), so the
+    read path is a plain projection that can be streamed as-is. `projection`
+    narrows it further (?fields=).
+    """
     query = {}
     if wallet_address:
         query["wallet_address"] = wallet_address
@@ -137,14 +256,123 @@ async def list_tasks(wallet_address: str | None = None,
     if group_id:
         query["group_id"] = group_id
 
-    tasks = await tasks_db.find(query).to_list(None)
+    return tasks_db.find(query, projection or TASK_PROJECTION, batch_size=batch_size)
+
+
+# ------------------------------------------------------------
+# EXPORT GROUP TASKS
+# ------------------------------------------------------------
+
+EXPORT_CSV_COLUMNS = [
+    field for field in TASK_PROJECTION if field not in ("_id", "metadata")
+] + [f"metadata.{field}" for field in TaskMetadata.model_fields]
+
+
+async def export_group_tasks(group_id: str, user: dict,
+                             fmt: str = "ndjson", compress: bool = False):
+    """
+    Build a streaming body (NDJSON or CSV) over every task of a group.
+    Only members of the group can export. Returns (chunks, media_type,
+    filename).
+    """
+    await ensure(group_id, user, Perm.VIEW_TASK)
+
+    cursor = await prefetch(tasks_db.find(
+        {"group_id": group_id},
+        TASK_PROJECTION,
+        batch_size=EXPORT_BATCH_SIZE,
+    ).sort("created_at", 1))
 
-    # Ensure status exists
-    for t in tasks:
-        if "status" not in t:
-            t["status"] = "pending"
+    if fmt == "csv":
+        chunks, media_type = csv_stream(cursor, EXPORT_CSV_COLUMNS), "text/csv"
+    else:
+        chunks, media_type = ndjson_stream(cursor), "application/x-ndjson"
+
+    filename = f"{group_id}_tasks.{fmt}"
+    if compress:
+        return gzip_stream(chunks), "application/gzip", filename + ".gz"
 
-    return [_calculate_fields(t) for t in tasks]
+    return chunks, media_type, filename
+
+
+# ------------------------------------------------------------
+# GROUP EVENTS (SSE)
+# ------------------------------------------------------------
+
+async def group_events(group_id: str, request: Request, user: dict):
+    """Live task/comment events of a group as an SSE stream — members only."""
+    await ensure(group_id, user, Perm.VIEW_TASK)
+    return sse_stream(request, group_channel(group_id), SSE_HEARTBEAT_SECONDS)
+
+
+# ------------------------------------------------------------
+# GROUP STATS
+# ------------------------------------------------------------
+
+group_stats_cache = TTLCache(GROUP_STATS_CACHE_TTL)
+
+
+def _group_stats_pipeline(group_id: str, now: datetime) -> list:
+    return [
+        {"$match": {"group_id": group_id}},
+        {"$project": {
+            "_id": 0, "status": 1, "priority": 1, "wallet_address": 1,
+            "due_at": 1, "is_completed": 1,
+            "metadata.estimated_hours": 1, "metadata.actual_hours": 1,
+        }},
+        {"$facet": {
+            "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "by_priority": [{"$group": {"_id": "$priority", "count": {"$sum": 1}}}],
+            "by_assignee": [{"$group": {"_id": "$wallet_address", "count": {"$sum": 1}}}],
+            "overdue": [
+                {"$match": {"due_at": {"$lt": now}, "is_completed": {"$ne": True}}},
+                {"$count": "count"},
+            ],
+            "totals": [{"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$is_completed", True]}, 1, 0]}},
+                "estimated_hours": {"$sum": "$metadata.estimated_hours"},
+                "actual_hours": {"$sum": "$metadata.actual_hours"},
+            }}],
+        }},
+    ]
+
+
+async def get_group_stats(group_id: str, user: dict) -> dict:
+    """
+    Dashboard numbers for a group in a single $facet aggregation. Results
+    are cached for GROUP_STATS_CACHE_TTL seconds (shared by all members).
+    """
+    await ensure(group_id, user, Perm.VIEW_TASK)
+
+    cached = group_stats_cache.get(group_id)
+    if cached is not None:
+        return cached
+
+    now = datetime.utcnow()
+    result = await tasks_db.aggregate(_group_stats_pipeline(group_id, now)).to_list(1)
+    facets = result[0] if result else {}
+
+    totals = (facets.get("totals") or [{}])[0]
+    overdue = (facets.get("overdue") or [{}])[0]
+    total = totals.get("total", 0)
+
+    stats = {
+        "group_id": group_id,
+        "total_tasks": total,
+        "by_status": {b["_id"] or "pending": b["count"] for b in facets.get("by_status", [])},
+        "by_priority": {b["_id"] or "medium": b["count"] for b in facets.get("by_priority", [])},
+        "overdue_tasks": overdue.get("count", 0),
+        "completion_rate": (totals.get("completed", 0) / total * 100) if total else 0,
+        "tasks_per_assignee": {b["_id"] or "unassigned": b["count"] for b in facets.get("by_assignee", [])},
+        "estimated_hours": totals.get("estimated_hours", 0) or 0,
+        "actual_hours": totals.get("actual_hours", 0) or 0,
+        "generated_at": _format_datetime(now),
+    }
+
+    group_stats_cache.set(group_id, stats)
+    return stats
 
 
 # ------------------------------------------------------------
@@ -159,12 +387,7 @@ async def list_attachments(task_id: str, user: dict):
 
     # Check permission
     if task.get("group_id"):
-        member = await group_members_db.find_one({
-            "wallet_address": user["wallet_address"],
-            "group_id": task["group_id"]
-        })
-        if not member:
-            raise HTTPException(403, "Not a member of this group")
+        await ensure(task["group_id"], user, Perm.VIEW_TASK)
     else:
         if task["user_id"] != user["user_id"]:
             raise HTTPException(403, "Unauthorized")
@@ -187,6 +410,11 @@ async def add_attachment(task_id: str, user: dict, file_name: str,
                          file_url: str, file_size_bytes: int = 0,
                          mime_type: str = ""):
 
+    # Tăng counter trên task (đồng thời kiểm tra task tồn tại và quyền)
+    task = await _count_submission(task_id, user, "attachment")
+    # Task có attachment được tính là completed trong profile summary
+    invalidate_group_profiles(task.get("group_id"))
+
     now = _format_datetime(datetime.utcnow())
 
     attachment = {
@@ -212,6 +440,8 @@ async def add_verification(task_id: str, user: dict,
                            message: str, signature: str,
                            tx_hash: str | None = None):
 
+    await _count_submission(task_id, user, "verification")
+
     now = _format_datetime(datetime.utcnow())
 
     verification = {
@@ -224,6 +454,8 @@ async def add_verification(task_id: str, user: dict,
         "verified_on_chain": False,
         "tx_hash": tx_hash,
         "verified_at": now,
+        # None = chờ jobs/verification_pipeline.py kiểm tra chữ ký
+        "signature_valid": None,
     }
 
     await task_verifications_db.insert_one(verification)
@@ -231,54 +463,243 @@ async def add_verification(task_id: str, user: dict,
 
 
 # ------------------------------------------------------------
-# UPDATE TASK
+# VERIFICATION MERKLE PROOF
 # ------------------------------------------------------------
 
-async def update_task(task_id: str, updates: TaskUpdate,
-                      request: Request, user: dict):
-
-    task = await tasks_db.find_one({"task_id": task_id})
+async def get_verification_proof(task_id: str, verification_id: str, user: dict) -> dict:
+    task = await tasks_db.find_one({"task_id": task_id}, {"group_id": 1, "user_id": 1})
     if not task:
         raise HTTPException(404, "Task not found")
 
-    # Permission
     if task.get("group_id"):
-        member = await group_members_db.find_one({
-            "wallet_address": user["wallet_address"],
-            "group_id": task["group_id"]
-        })
+        await ensure(task["group_id"], user, Perm.VIEW_TASK)
+    elif task.get("user_id") != user["user_id"]:
+        raise HTTPException(403, "Unauthorized")
 
-        if not member:
-            raise HTTPException(403, "Not a member of this group")
+    verification = await task_verifications_db.find_one({"_id": verification_id, "task_id": task_id})
+    if not verification:
+        raise HTTPException(404, "Verification not found")
 
-        if member["role"] not in ["owner", "admin"]:
-            raise HTTPException(403, "You don't have permission to update group tasks")
-    else:
-        if task["user_id"] != user["user_id"]:
-            raise HTTPException(403, "Unauthorized")
+    batch_id = verification.get("anchor_batch_id")
+    batch = await anchors_db.find_one({"_id": batch_id}) if batch_id else None
+    if not batch or batch.get("status") != "submitted":
+        raise HTTPException(404, "Verification is not anchored yet")
+
+    return {
+        "verification_id": verification_id,
+        "task_id": task_id,
+        "batch_id": batch_id,
+        "leaf": verification["merkle_leaf"],
+        "leaf_index": verification["merkle_index"],
+        "proof": verification["merkle_proof"],
+        "root": batch["root"],
+        "leaf_count": batch["leaf_count"],
+        "tx_hash": batch["tx_hash"],
+        "anchored_at": batch["submitted_at"],
+    }
+
+
+# ------------------------------------------------------------
+# VALIDATE VERIFICATIONS (BATCH)
+# ------------------------------------------------------------
+
+async def validate_verifications(verification_ids: list, user: dict) -> list:
+    """
+    Check the signatures of many verifications at once (reviewer flow).
+    The caller must be owner/admin of each task's group, or the owner of
+    the personal task.
+    """
+    docs = await task_verifications_db.find(
+        {"_id": {"$in": verification_ids}},
+        {"_id": 1, "task_id": 1, "wallet_address": 1, "message": 1, "signature": 1},
+    ).to_list(None)
+
+    found = {d["_id"] for d in docs}
+    missing = [v for v in verification_ids if v not in found]
+    if missing:
+        raise HTTPException(404, f"Verification not found: {missing[0]}")
+
+    tasks = {
+        t["task_id"]: t
+        async for t in tasks_db.find(
+            {"task_id": {"$in": list({d["task_id"] for d in docs})}},
+            {"task_id": 1, "group_id": 1, "user_id": 1},
+        )
+    }
+    reviewer_groups = set()
+    for group_id in {t["group_id"] for t in tasks.values() if t.get("group_id")}:
+        if await resolve(group_id, user) & Perm.REVIEW_VERIFICATION:
+            reviewer_groups.add(group_id)
+
+    for d in docs:
+        task = tasks.get(d["task_id"])
+        if not task:
+            raise HTTPException(404, f"Task not found: {d['task_id']}")
+        if task.get("group_id"):
+            allowed = task["group_id"] in reviewer_groups
+        else:
+            allowed = task.get("user_id") == user["user_id"]
+        if not allowed:
+            raise HTTPException(403, f"You don't have permission to review verification {d['_id']}")
+
+    results = await verify_documents(docs)
+    await store_results(docs, results)
+
+    return [
+        {"verification_id": d["_id"], "task_id": d["task_id"], "signature_valid": valid}
+        for d, valid in zip(docs, results)
+    ]
 
-    updates_dict = updates.dict(exclude_unset=True)
 
-    # Validate completed
-    if updates_dict.get("status") == "completed":
-        attachments = await task_attachments_db.find({
-            "task_id": task_id,
-            "user_id": user["user_id"]
-        }).to_list(None)
+# ------------------------------------------------------------
+# UPDATE TASK
+# ------------------------------------------------------------
+
+def _update_paths(changes: dict, now: str) -> dict:
+    """
+    $set cho đúng các field client gửi (metadata.* theo từng key) cùng các
+    field dẫn xuất của chúng; không đọc lại document.
+    """
+    paths = {"updated_at": now}
+    for field, value in changes.items():
+        if field == "metadata" and value is not None:
+            for key, item in value.items():
+                if not isinstance(key, str) or not key or key.startswith("$") or "." in key:
+                    raise HTTPException(400, f"Invalid metadata key: {key!r}")
+                paths[f"metadata.{key}"] = item
+        elif field == "metadata":
+            paths["metadata"] = {}
+        else:
+            paths[field] = value
+
+    if "status" in changes:
+        paths["is_completed"] = changes["status"] == "completed"
+        if changes["status"] != "completed":
+            paths["completed_at"] = None
+    if "priority" in changes:
+        paths["color_code"] = PRIORITY_COLORS.get(changes["priority"], DEFAULT_COLOR)
+    if "due_date" in changes:
+        paths["due_at"] = _to_utc_naive(changes["due_date"])
+        # Hạn mới → deadline scanner báo lại
+        paths["due_soon_notified"] = False
+        paths["overdue_notified"] = False
+        if isinstance(changes["due_date"], datetime):
+            paths["due_date"] = _format_datetime(changes["due_date"])
+    return paths
+
+
+def _apply_paths(task: dict, paths: dict) -> dict:
+    for path, value in paths.items():
+        field, _, key = path.partition(".")
+        if key:
+            task[field] = {**(task.get(field) or {}), key: value}
+        else:
+            task[path] = value
+    return task
+
+
+def _version_filter(version: int):
+    # Task tạo trước khi có version được coi là version 0
+    return {"$in": [0, None]} if version == 0 else version
+
+
+async def _conditional_update(query: dict, paths: dict, completing: bool, now: str) -> dict | None:
+    """Một find_one_and_update; trả về document trước khi ghi, None nếu filter không khớp."""
+    update = {"$set": paths, "$inc": {"version": 1}}
+    if not completing:
+        return await tasks_db.find_one_and_update(query, update, projection=TASK_PROJECTION)
+
+    # completed_at chỉ đặt ở lần hoàn thành đầu tiên, task đã completed thì giữ nguyên
+    before = await tasks_db.find_one_and_update(
+        {**query, "completed_at": None},
+        {"$set": {**paths, "completed_at": now}, "$inc": {"version": 1}},
+        projection=TASK_PROJECTION,
+    )
+    if before is None:
+        before = await tasks_db.find_one_and_update(
+            {**query, "completed_at": {"$ne": None}}, update, projection=TASK_PROJECTION,
+        )
+    return before
+
+
+async def _check_update_failure(task_id: str, user: dict, expected_version: int | None, completing: bool) -> dict:
+    """
+    Filter không khớp: đọc lại task để trả đúng 404 / 403 / 409 / 400.
+    Trả về task nếu mọi điều kiện đều đúng (cache nhóm của user đã cũ) để ghi lại.
+    """
+    user_id = user["user_id"]
+    current = await tasks_db.find_one({"task_id": task_id}, {
+        "_id": 0, "group_id": 1, "user_id": 1, "version": 1,
+        f"attachment_counts_by_user.{user_id}": 1, f"verification_counts_by_user.{user_id}": 1,
+    })
+    if not current:
+        raise HTTPException(404, "Task not found")
 
-        verifications = await task_verifications_db.find({
-            "task_id": task_id,
-            "user_id": user["user_id"]
-        }).to_list(None)
+    if current.get("group_id"):
+        await ensure(current["group_id"], user, Perm.EDIT_TASK,
+                     "You don't have permission to update group tasks")
+    elif current.get("user_id") != user_id:
+        raise HTTPException(403, "Unauthorized")
 
+    version = current.get("version", 0)
+    if expected_version is not None and version != expected_version:
+        raise HTTPException(409, f"Task was modified by another request (current version {version})")
+
+    if completing:
+        attachments = current.get("attachment_counts_by_user", {}).get(user_id, 0)
+        verifications = current.get("verification_counts_by_user", {}).get(user_id, 0)
         if not attachments or not verifications:
             raise HTTPException(400, "Attachment and verification required to complete task")
+    return current
 
-    task.update(updates_dict)
-    task = _calculate_fields(task)
 
-    await tasks_db.update_one({"task_id": task_id}, {"$set": task})
+async def update_task(task_id: str, updates: TaskUpdate,
+                      request: Request, user: dict):
+    changes = updates.dict(exclude_unset=True)
+    expected_version = changes.pop("version", None)
+    if not changes:
+        raise HTTPException(400, "No fields to update")
+
+    now = _format_datetime(datetime.utcnow())
+    paths = _update_paths(changes, now)
+    completing = changes.get("status") == "completed"
+
+    conditions = {}
+    if expected_version is not None:
+        conditions["version"] = _version_filter(expected_version)
+    if completing:
+        # Validate completed — dùng counter trên task, không đọc collection con
+        conditions[f"attachment_counts_by_user.{user['user_id']}"] = {"$gte": 1}
+        conditions[f"verification_counts_by_user.{user['user_id']}"] = {"$gte": 1}
+
+    # Quyền nằm trong filter: task cá nhân của user, hoặc task của group user được sửa
+    editable_groups = await groups_with(user, Perm.EDIT_TASK)
+    permitted = {"$or": [
+        {"group_id": {"$in": editable_groups}},
+        {"group_id": {"$in": [None, ""]}, "user_id": user["user_id"]},
+    ]}
+
+    before = await _conditional_update({"task_id": task_id, **permitted, **conditions}, paths, completing, now)
+    if before is None:
+        current = await _check_update_failure(task_id, user, expected_version, completing)
+        before = await _conditional_update(
+            {"task_id": task_id, "group_id": current.get("group_id"), **conditions}, paths, completing, now
+        )
+        if before is None:
+            raise HTTPException(409, "Task was modified by another request")
+
+    task = _apply_paths(dict(before), paths)
+    task["task_id"] = task_id
+    task["version"] = before.get("version", 0) + 1
+    if completing and not before.get("completed_at"):
+        task["completed_at"] = now
+
+    # open_task_count theo trạng thái ngay trước lần ghi này
+    await inc_group_counters(task.get("group_id"),
+                             open_task_count=int(_is_open(task)) - int(_is_open(before)))
     await log_action(request, user["user_id"], user["wallet_address"], "update_task", task_id)
+    await _publish_task_event("updated", task)
+    invalidate_group_profiles(task.get("group_id"))
 
     return task
 
@@ -294,22 +715,19 @@ async def delete_task(task_id: str, request: Request, user: dict):
 
     # Permission
     if task.get("group_id"):
-        member = await group_members_db.find_one({
-            "wallet_address": user["wallet_address"],
-            "group_id": task["group_id"]
-        })
-
-        if not member:
-            raise HTTPException(403, "Not a member of this group")
-
-        if member["role"] != "owner":
-            raise HTTPException(403, "Only owner can delete group tasks")
+        await ensure(task["group_id"], user, Perm.DELETE_TASK, "Only owner can delete group tasks")
 
     else:
         if task["user_id"] != user["user_id"]:
             raise HTTPException(403, "Unauthorized")
 
-    await tasks_db.delete_one({"task_id": task_id})
+    deleted = await tasks_db.find_one_and_delete({"task_id": task_id})
+    # Chỉ request thực sự xoá được document mới giảm counter
+    if deleted is not None:
+        await inc_group_counters(deleted.get("group_id"), task_count=-1,
+                                 open_task_count=-int(_is_open(deleted)))
     await log_action(request, user["user_id"], user["wallet_address"], "delete_task", task_id)
+    await _publish_task_event("deleted", task)
+    invalidate_group_profiles(task.get("group_id"))
 
     return {"status": "deleted", "task_id": task_id}
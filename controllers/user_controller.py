@@ -5,12 +5,19 @@ from datetime import datetime
 from typing import List
 from models.user import ProfileSummary, UserUpdateRequest, UserResponse
 from config.database import get_collection
+from config.settings import PROFILE_CACHE_TTL, PROFILE_CACHE_STALE_SECONDS, PROFILE_CACHE_MAXSIZE
+from utils.swr_cache import SWRCache
+from utils.projection import mongo_projection
 
 users_db = get_collection("collection_users")
 groups_db = get_collection("collection_groups")
 group_members_db = get_collection("collection_group_members")
 tasks_db = get_collection("collection_tasks")
-attachments_db = get_collection("collection_task_attachments")
+
+# (summary, groups_info, all_tasks) theo wallet (chữ thường, như trên member document)
+profile_cache = SWRCache("profile_cache", PROFILE_CACHE_TTL, PROFILE_CACHE_STALE_SECONDS, PROFILE_CACHE_MAXSIZE)
+# group_id -> các wallet có profile đang cache phụ thuộc vào group đó
+_group_wallets: dict[str, set] = {}
 
 
 # ------------------------------------------------------------
@@ -32,22 +39,66 @@ def default_summary():
     }
 
 
+# ------------------------------------------------------------
+# PROFILE CACHE
+# ------------------------------------------------------------
+
+async def get_profile_summary(wallet_address: str):
+    """Cached calculate_profile_summary (stale-while-revalidate)."""
+    # URL thường là checksum-case; membership lưu và invalidate bằng chữ thường
+    wallet = wallet_address.lower()
+
+    async def load():
+        result = await calculate_profile_summary(wallet)
+        for group in result[1]:
+            _group_wallets.setdefault(group["group_id"], set()).add(wallet)
+        return result
+
+    return await profile_cache.get(wallet, load)
+
+
+def invalidate_profiles(*wallet_addresses: str):
+    for wallet_address in wallet_addresses:
+        if wallet_address:
+            profile_cache.invalidate(wallet_address.lower())
+
+
+def invalidate_group_profiles(group_id: str | None):
+    """Task / membership của group thay đổi → bỏ cache profile của các member."""
+    if group_id:
+        invalidate_profiles(*_group_wallets.pop(group_id, ()))
+
+
 # ------------------------------------------------------------
 # GET USER
 # ------------------------------------------------------------
 
-async def get_user(wallet_address: str) -> UserResponse:
-    user = await users_db.find_one({"wallet_address": wallet_address})
+# Field phải tính từ task / membership, không nằm trên user document
+PROFILE_FIELDS = {"profile_summary", "user_tasks"}
+
+
+async def get_user(wallet_address: str, fields: tuple | None = None):
+    """
+    Full UserResponse, or — with `fields` (?fields=) — a dict holding only
+    those fields; the profile summary is skipped when none of them needs it.
+    """
+    projection = mongo_projection(fields)
+    user = await users_db.find_one({"wallet_address": wallet_address}, projection)
     if not user:
         raise HTTPException(404, "User not found")
 
-    summary, groups_info, all_tasks = await calculate_profile_summary(wallet_address)
+    if fields is not None and not PROFILE_FIELDS.intersection(fields):
+        return user
+
+    summary, groups_info, all_tasks = await get_profile_summary(wallet_address)
 
     user["profile_summary"] = summary
     user["groups_overview"] = groups_info
     user["total_group_tasks"] = summary["total_tasks"]
     user["user_tasks"] = all_tasks
 
+    if fields is not None:
+        return user
     return UserResponse(**user)
 
 
@@ -56,7 +107,7 @@ async def get_user(wallet_address: str) -> UserResponse:
 # ------------------------------------------------------------
 
 async def calculate_profile_summary(wallet_address: str):
-    memberships = await group_members_db.find({"wallet_address": wallet_address}).to_list(None)
+    memberships = await group_members_db.find({"wallet_address": wallet_address.lower()}).to_list(None)
     if not memberships:
         return default_summary(), [], []
 
@@ -93,14 +144,11 @@ async def calculate_profile_summary(wallet_address: str):
         else:
             pending += 1
 
-        # Rule: nếu có attachment coi như completed
-        task_id = t.get("task_id")
-        if task_id:
-            attachments = await attachments_db.find({"task_id": task_id}).to_list(None)
-            if attachments and status != "completed":
-                completed += 1
-                pending = max(0, pending - 1)
-                t["is_completed"] = True
+        # Rule: nếu có attachment coi như completed (counter trên task)
+        if t.get("attachment_count", 0) > 0 and status != "completed":
+            completed += 1
+            pending = max(0, pending - 1)
+            t["is_completed"] = True
 
     productivity_score = (completed / total * 100) if total > 0 else 0
 
@@ -121,35 +169,24 @@ async def calculate_profile_summary(wallet_address: str):
 # ------------------------------------------------------------
 
 async def get_user_groups_and_tasks(wallet_address: str):
-    memberships = await group_members_db.find({"wallet_address": wallet_address}).to_list(None)
+    # Avoid circular import
+    from controllers.group_controller import _my_groups_pipeline
 
-    if not memberships:
-        return {"groups": [], "total_group_tasks": 0}
-
-    groups_info = []
-    total_tasks = 0
+    groups = await group_members_db.aggregate(_my_groups_pipeline(wallet_address)).to_list(None)
 
-    for member in memberships:
-        group_id = member["group_id"]
-
-        group = await groups_db.find_one({"group_id": group_id})
-        if not group:
-            continue
-
-        group_tasks = await tasks_db.find({"group_id": group_id}).to_list(None)
-        task_count = len(group_tasks)
-        total_tasks += task_count
-
-        groups_info.append({
-            "group_id": group_id,
-            "group_name": group.get("name", ""),
-            "role": member.get("role", "member"),
-            "task_count": task_count,
-        })
+    groups_info = [
+        {
+            "group_id": g["group_id"],
+            "group_name": g.get("name", ""),
+            "role": g.get("role", "member"),
+            "task_count": g.get("task_count", 0),
+        }
+        for g in groups
+    ]
 
     return {
         "groups": groups_info,
-        "total_group_tasks": total_tasks
+        "total_group_tasks": sum(g["task_count"] for g in groups_info)
     }
 
 
@@ -209,7 +246,7 @@ async def get_all_users() -> List[UserResponse]:
         if not wallet_address:
             continue
 
-        summary, groups_info, all_tasks = await calculate_profile_summary(wallet_address)
+        summary, groups_info, all_tasks = await get_profile_summary(wallet_address)
 
         user["profile_summary"] = summary
         user["groups_overview"] = groups_info
@@ -0,0 +1,153 @@
+# dependencies/authz.py
+"""
+Phân quyền trong group: role → bitmask (Perm), compile một lần lúc import.
+
+Quyền của một user trong group được resolve bằng đúng một lookup
+collection_group_members rồi cache theo (group_id, wallet), nên kiểm tra
+quyền chỉ còn là một phép AND bit. Wallet trên member document luôn là
+chữ thường, nên wallet từ JWT được lower() trước khi tra.
+
+    @router.get("/{group_id}/stats")
+    async def route(group_id: str, user=Depends(require(Perm.VIEW_TASK))): ...
+
+    await ensure(task["group_id"], user, Perm.EDIT_TASK, "You don't have permission ...")
+"""
+from enum import IntFlag
+
+from fastapi import Depends, HTTPException, Request
+
+from config.database import get_collection
+from config.settings import AUTHZ_CACHE_TTL
+from dependencies.auth import get_current_user
+from utils.metrics import metrics
+from utils.ttl_cache import TTLCache
+
+group_members_db = get_collection("collection_group_members")
+
+
+class Perm(IntFlag):
+    NONE = 0
+    VIEW_TASK = 1 << 0
+    COMMENT = 1 << 1
+    SUBMIT_WORK = 1 << 2          # attachment / verification
+    CREATE_TASK = 1 << 3
+    EDIT_TASK = 1 << 4
+    ASSIGN_TASK = 1 << 5
+    REVIEW_VERIFICATION = 1 << 6
+    INVITE_MEMBER = 1 << 7
+    REMOVE_MEMBER = 1 << 8
+    CHANGE_ROLE = 1 << 9
+    DELETE_TASK = 1 << 10
+    DELETE_ANY_COMMENT = 1 << 11
+    UPDATE_GROUP = 1 << 12
+    DELETE_GROUP = 1 << 13
+
+
+ALL = Perm(sum(Perm))
+
+# Bảng role — nguồn duy nhất cho cả kiểm tra quyền lẫn field `permissions`
+# lưu trên member document
+ROLE_PERMISSIONS = {
+    "guest": ["view_task", "comment"],
+    "member": ["view_task", "comment", "submit_work"],
+    "admin": [
+        "view_task", "comment", "submit_work",
+        "create_task", "edit_task", "assign_task", "review_verification",
+        "invite_member", "remove_member", "change_role",
+    ],
+    "owner": ["*"],
+}
+
+
+def _compile(names: list) -> Perm:
+    if "*" in names:
+        return ALL
+    mask = Perm.NONE
+    for name in names:
+        mask |= Perm[name.upper()]
+    return mask
+
+
+ROLE_MASKS = {role: _compile(names) for role, names in ROLE_PERMISSIONS.items()}
+
+# Role lạ trong DB → chỉ được xem như guest
+DEFAULT_MASK = ROLE_MASKS["guest"]
+
+_cache = TTLCache(AUTHZ_CACHE_TTL, maxsize=10000)
+# wallet → {group_id: Perm} của mọi group user là thành viên
+_groups_cache = TTLCache(AUTHZ_CACHE_TTL, maxsize=10000)
+
+
+def role_mask(role: str | None) -> Perm:
+    return ROLE_MASKS.get(role, DEFAULT_MASK)
+
+
+def permission_names(role: str) -> list:
+    return list(ROLE_PERMISSIONS.get(role, ROLE_PERMISSIONS["guest"]))
+
+
+async def resolve(group_id: str, user: dict) -> Perm:
+    """Perm của user trong group (Perm.NONE nếu không phải thành viên)."""
+    wallet = user["wallet_address"].lower()
+    key = (group_id, wallet)
+    mask = _cache.get(key)
+    if mask is not None:
+        metrics.inc("authz_cache", result="hit")
+        return mask
+
+    metrics.inc("authz_cache", result="miss")
+    member = await group_members_db.find_one(
+        {"group_id": group_id, "wallet_address": wallet},
+        {"role": 1},
+    )
+    mask = role_mask(member.get("role")) if member else Perm.NONE
+    _cache.set(key, mask)
+    return mask
+
+
+async def ensure(group_id: str, user: dict, perm: Perm,
+                 detail: str = "You don't have permission to perform this action") -> Perm:
+    mask = await resolve(group_id, user)
+    if not mask:
+        raise HTTPException(403, "Not a member of this group")
+    if mask & perm != perm:
+        raise HTTPException(403, detail)
+    return mask
+
+
+async def groups_with(user: dict, perm: Perm) -> list:
+    """
+    group_id của các group mà user có `perm`, để nhúng điều kiện quyền vào
+    filter của một lần ghi (`{"group_id": {"$in": ...}}`) thay vì đọc trước.
+    """
+    wallet = user["wallet_address"].lower()
+    masks = _groups_cache.get(wallet)
+    if masks is None:
+        metrics.inc("authz_groups_cache", result="miss")
+        masks = {}
+        async for member in group_members_db.find({"wallet_address": wallet}, {"_id": 0, "group_id": 1, "role": 1}):
+            masks[member["group_id"]] = role_mask(member.get("role"))
+        _groups_cache.set(wallet, masks)
+    else:
+        metrics.inc("authz_groups_cache", result="hit")
+    return [group_id for group_id, mask in masks.items() if mask & perm == perm]
+
+
+def require(perm: Perm, group_param: str = "group_id"):
+    """FastAPI dependency: current user, sau khi kiểm tra `perm` trên group ở path."""
+    async def dependency(request: Request, user=Depends(get_current_user)) -> dict:
+        await ensure(request.path_params[group_param], user, perm)
+        return user
+
+    return dependency
+
+
+def invalidate(group_id: str, wallet_address: str | None = None):
+    """Gọi sau khi membership / role thay đổi."""
+    if wallet_address is not None:
+        _cache.pop((group_id, wallet_address.lower()))
+        _groups_cache.pop(wallet_address.lower())
+    else:
+        for key in [k for k in _cache.keys() if k[0] == group_id]:
+            _cache.pop(key)
+        _groups_cache.clear()
@@ -0,0 +1,46 @@
+# gunicorn.conf.py
+"""
+gunicorn main:app -c gunicorn.conf.py
+
+Mặc định 1 worker. Mỗi worker là một process riêng với event loop, Mongo
+client, process pool và cache riêng; job nền chỉ chạy trong worker đang giữ
+JOBS_LOCK_FILE. Trạng thái in-process CHƯA được chia sẻ giữa các worker:
+
+  * utils/event_hub.py dùng InMemoryBroker: client SSE ở worker A không nhận
+    event task / comment ghi qua worker B;
+  * InMemoryRateLimitBackend: giới hạn thực tế thành N lần cấu hình;
+  * cache quyền (dependencies/authz.py) và cache profile chỉ bị invalidate ở
+    worker xử lý request ghi: worker khác có thể dùng dữ liệu cũ tới
+    AUTHZ_CACHE_TTL / PROFILE_CACHE_TTL (vd. member vừa bị xoá vẫn còn quyền).
+
+Chỉ tăng WEB_CONCURRENCY (hoặc "auto" = số CPU theo quota container) khi
+chấp nhận các điều trên, hoặc sau khi có broker / rate-limit backend dùng chung.
+"""
+import os
+
+from utils.cpu import available_cpus
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# "auto": 1 worker / CPU theo quota của container (không phải số core của host)
+_concurrency = os.getenv("WEB_CONCURRENCY", "1")
+workers = available_cpus() if _concurrency == "auto" else max(1, int(_concurrency))
+
+# preload: import app một lần ở master rồi fork (tiết kiệm RAM, start nhanh).
+# An toàn vì main.create_app() không mở kết nối; client Motor tạo lazily sau fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+# SIGTERM → worker ngừng nhận request, lifespan shutdown chờ job nền chạy nốt batch
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
+# Chỉ một worker chạy scheduler; worker đó chết thì worker khác lấy lock
+os.environ.setdefault("JOBS_LOCK_FILE", "/tmp/taskapp-jobs.lock")
+
+
+def post_fork(server, worker):
+    # Phòng khi có code trong master đã chạm vào DB: không dùng lại client của master
+    from config.database import reset_client
+    reset_client()
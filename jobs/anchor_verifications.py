@@ -0,0 +1,134 @@
+# jobs/anchor_verifications.py
+"""
+Gom các verification hợp lệ chưa được anchor thành một Merkle tree và
+anchor root (1 transaction cho cả batch).
+
+Mỗi batch đi qua các trạng thái trong collection_verification_anchors:
+  claimed   → verification đã được gắn anchor_batch_id
+  built     → đã tính root + lưu proof cho từng leaf
+  submitted → root đã gửi qua ChainAnchor, tx_hash ghi vào từng verification
+Batch dở dang (process chết giữa chừng) được hoàn tất ở lần chạy sau; tree
+dựng lại từ các leaf đã claim theo thứ tự _id nên root không đổi.
+
+Chưa cấu hình CHAIN_ANCHOR (mặc định "stub") thì batch dừng ở built: proof
+đã có nhưng tx_hash / verified_on_chain không được ghi, và batch được
+submit thật ở lần chạy đầu tiên sau khi có backend.
+"""
+import logging
+import uuid
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from config.database import get_collection
+from config.settings import ANCHOR_MAX_LEAVES
+from utils import merkle
+from utils.chain_anchor import get_chain_anchor
+
+logger = logging.getLogger(__name__)
+
+verifications_db = get_collection("collection_task_verifications")
+anchors_db = get_collection("collection_verification_anchors")
+
+
+def _format_datetime(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        return dt.isoformat() + "Z"
+    else:
+        return dt.isoformat().replace("+00:00", "Z")
+
+
+async def _claim_batch() -> str | None:
+    ids = [
+        d["_id"]
+        async for d in verifications_db.find(
+            {"signature_valid": True, "anchor_batch_id": None, "tx_hash": None},
+            {"_id": 1},
+        ).sort("_id", 1).limit(ANCHOR_MAX_LEAVES)
+    ]
+    if not ids:
+        return None
+
+    batch_id = f"anchor_{uuid.uuid4().hex}"
+    await anchors_db.insert_one({
+        "_id": batch_id,
+        "status": "claimed",
+        "created_at": _format_datetime(datetime.utcnow()),
+    })
+    # Điều kiện anchor_batch_id = None: instance khác đã claim thì bỏ qua
+    await verifications_db.update_many(
+        {"_id": {"$in": ids}, "anchor_batch_id": None},
+        {"$set": {"anchor_batch_id": batch_id}},
+    )
+    return batch_id
+
+
+async def _build(batch_id: str):
+    docs = await verifications_db.find(
+        {"anchor_batch_id": batch_id},
+        {"_id": 1, "task_id": 1, "wallet_address": 1, "message": 1, "signature": 1},
+    ).sort("_id", 1).to_list(None)
+
+    if not docs:
+        await anchors_db.update_one({"_id": batch_id}, {"$set": {"status": "empty"}})
+        return
+
+    leaves = [
+        merkle.leaf_hash(d["task_id"], d.get("wallet_address", ""), d["message"], d["signature"])
+        for d in docs
+    ]
+    levels = merkle.build_tree(leaves)
+    root = levels[-1][0]
+
+    await verifications_db.bulk_write([
+        UpdateOne({"_id": d["_id"]}, {"$set": {
+            "merkle_leaf": leaves[i],
+            "merkle_index": i,
+            "merkle_proof": merkle.proof(levels, i),
+        }})
+        for i, d in enumerate(docs)
+    ], ordered=False)
+
+    await anchors_db.update_one(
+        {"_id": batch_id},
+        {"$set": {"status": "built", "root": root, "leaf_count": len(leaves)}},
+    )
+
+
+async def _submit(batch_id: str, anchor):
+    batch = await anchors_db.find_one({"_id": batch_id})
+    tx_hash = await anchor.submit_root(batch["root"], batch["leaf_count"])
+    now = _format_datetime(datetime.utcnow())
+
+    await verifications_db.update_many(
+        {"anchor_batch_id": batch_id},
+        {"$set": {"tx_hash": tx_hash, "verified_on_chain": True, "anchored_at": now}},
+    )
+    await anchors_db.update_one(
+        {"_id": batch_id},
+        {"$set": {"status": "submitted", "tx_hash": tx_hash, "submitted_at": now}},
+    )
+    logger.info(f"Anchored {batch['leaf_count']} verification(s) in {batch_id} (root {batch['root']})")
+
+
+async def _finish(batch: dict, anchor):
+    if batch["status"] == "claimed":
+        await _build(batch["_id"])
+        batch = await anchors_db.find_one({"_id": batch["_id"]})
+    if batch["status"] == "built" and anchor is not None:
+        await _submit(batch["_id"], anchor)
+
+
+async def anchor_verifications():
+    anchor = get_chain_anchor()
+
+    # Hoàn tất batch dở dang trước (built chỉ khi có backend để submit)
+    unfinished = ["claimed", "built"] if anchor is not None else ["claimed"]
+    async for batch in anchors_db.find({"status": {"$in": unfinished}}):
+        await _finish(batch, anchor)
+
+    while True:
+        batch_id = await _claim_batch()
+        if not batch_id:
+            return
+        await _finish({"_id": batch_id, "status": "claimed"}, anchor)
@@ -0,0 +1,156 @@
+# jobs/audit_retention.py
+"""
+Retention cho collection_audit_logs: log cũ hơn AUDIT_RETENTION_DAYS được
+ghi ra file NDJSON nén theo ngày (utils/audit_archive.py) rồi xoá khỏi Mongo
+theo batch, để collection "nóng" và index của nó luôn nhỏ.
+
+Chỉ archive log đã được gộp vào rollup (dưới watermark của
+jobs/audit_rollup.py) nên dashboard không bị mất số liệu.
+
+Thứ tự: ghi part → index (status "written") → xoá → index ("complete").
+Nếu process chết sau khi ghi file mà chưa xoá xong, lần chạy sau xoá nốt
+khoảng thời gian của part đó trước khi archive tiếp, nên không có log nào
+bị ghi hai lần hay bị mất.
+
+Archive là bản duy nhất sau khi xoá, nên job không làm gì (và không xoá gì)
+khi AUDIT_ARCHIVE_DIR chưa trỏ tới một disk bền đã mount. File I/O và fsync
+chạy qua asyncio.to_thread để không chặn request.
+
+    python -m jobs.audit_retention
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from config.database import get_collection
+from config.settings import AUDIT_RETENTION_DAYS, AUDIT_ARCHIVE_BATCH_SIZE
+from jobs.audit_rollup import get_watermark
+from utils import audit_archive
+from utils.metrics import metrics
+from utils.streaming import dumps
+
+logger = logging.getLogger(__name__)
+
+audit_logs_db = get_collection("collection_audit_logs")
+
+
+def _format_datetime(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        return dt.isoformat() + "Z"
+    else:
+        return dt.isoformat().replace("+00:00", "Z")
+
+
+async def _cutoff() -> str | None:
+    """Log có created_at < cutoff (theo ngày) thì được archive."""
+    watermark = await get_watermark()
+    if watermark is None:
+        return None
+    retention = (datetime.utcnow() - timedelta(days=AUDIT_RETENTION_DAYS)).strftime("%Y-%m-%d")
+    return min(retention, watermark[:10])
+
+
+async def _delete_range(start: str, end: str) -> int:
+    """Delete logs with start <= created_at <= end in bounded batches."""
+    query = {"created_at": {"$gte": start, "$lte": end}}
+    deleted = 0
+    while True:
+        ids = [d["_id"] async for d in audit_logs_db.find(query, {"_id": 1}).limit(AUDIT_ARCHIVE_BATCH_SIZE)]
+        if not ids:
+            return deleted
+        result = await audit_logs_db.delete_many({"_id": {"$in": ids}})
+        deleted += result.deleted_count
+        # nhường event loop cho request giữa các batch
+        await asyncio.sleep(0)
+
+
+async def _archive_day(day: str, index: dict, codec: str, root) -> int:
+    seq = audit_archive.next_seq(index, day)
+    writer = await asyncio.to_thread(audit_archive.PartWriter, day, seq, codec, root)
+
+    cursor = audit_logs_db.find(
+        {"created_at": {"$gte": day, "$lt": day + "~"}}
+    ).sort([("created_at", 1), ("_id", 1)]).batch_size(AUDIT_ARCHIVE_BATCH_SIZE)
+
+    count, first, last, lines = 0, None, None, []
+    try:
+        async for doc in cursor:
+            first = first or doc["created_at"]
+            last = doc["created_at"]
+            count += 1
+            lines.append(dumps(doc) + "\n")
+            if len(lines) >= AUDIT_ARCHIVE_BATCH_SIZE:
+                await asyncio.to_thread(writer.write, "".join(lines).encode("utf-8"))
+                lines = []
+        if lines:
+            await asyncio.to_thread(writer.write, "".join(lines).encode("utf-8"))
+        size = await asyncio.to_thread(writer.close)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+
+    part = {
+        "file": writer.relpath,
+        "day": day,
+        "seq": seq,
+        "codec": codec,
+        "count": count,
+        "bytes": size,
+        "min_created_at": first,
+        "max_created_at": last,
+        "status": "written",
+        "archived_at": _format_datetime(datetime.utcnow()),
+    }
+    index["parts"].append(part)
+    await asyncio.to_thread(audit_archive.save_index, index, root)
+
+    await _delete_range(first, last)
+    part["status"] = "complete"
+    await asyncio.to_thread(audit_archive.save_index, index, root)
+    return count
+
+
+async def archive_audit_logs():
+    try:
+        root = await asyncio.to_thread(audit_archive.check_archive_root)
+    except audit_archive.ArchiveUnavailable as exc:
+        logger.warning(f"Audit retention skipped, no log is deleted: {exc}")
+        return
+
+    cutoff = await _cutoff()
+    if cutoff is None:
+        return
+
+    try:
+        lock = await asyncio.to_thread(audit_archive.acquire_lock, root)
+    except BlockingIOError:
+        logger.info("Audit archive is locked by another process, skipping")
+        return
+
+    try:
+        index = await asyncio.to_thread(audit_archive.load_index, root)
+
+        # Hoàn tất phần xoá còn dở của lần chạy trước
+        for part in index["parts"]:
+            if part["status"] == "written":
+                await _delete_range(part["min_created_at"], part["max_created_at"])
+                part["status"] = "complete"
+                await asyncio.to_thread(audit_archive.save_index, index, root)
+
+        codec = audit_archive.default_codec()
+        while True:
+            oldest = await audit_logs_db.find_one(
+                {"created_at": {"$lt": cutoff}}, {"created_at": 1}, sort=[("created_at", 1)]
+            )
+            if not oldest:
+                break
+            day = oldest["created_at"][:10]
+            count = await _archive_day(day, index, codec, root)
+            metrics.inc("audit_logs_archived", count)
+            logger.info(f"Archived {count} audit log(s) for {day}")
+    finally:
+        await asyncio.to_thread(audit_archive.release_lock, lock)
+
+
+if __name__ == "__main__":
+    asyncio.run(archive_audit_logs())
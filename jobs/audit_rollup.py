@@ -0,0 +1,127 @@
+# jobs/audit_rollup.py
+"""
+Gộp collection_audit_logs thành bucket theo giờ và theo ngày cho mỗi
+(user_id, action), để dashboard đọc rollup nhỏ thay vì quét log thô.
+
+High-watermark (giờ đầu tiên chưa gộp) lưu trong collection_job_state. Mỗi
+lần chạy chỉ gộp các giờ đã trọn vẹn (trễ AUDIT_ROLLUP_LAG_SECONDS cho log
+đang ghi dở). Count của bucket được $set bằng kết quả tính lại cả giờ /
+cả ngày chứ không $inc, nên chạy lại sau crash không bị cộng trùng.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from config.database import get_collection
+from config.settings import AUDIT_ROLLUP_LAG_SECONDS
+from jobs.state import get_state, set_state
+
+logger = logging.getLogger(__name__)
+
+audit_logs_db = get_collection("collection_audit_logs")
+hourly_db = get_collection("collection_audit_rollups_hourly")
+daily_db = get_collection("collection_audit_rollups_daily")
+
+STATE_NAME = "audit_rollup"
+HOUR_FORMAT = "%Y-%m-%dT%H"
+# Số giờ tối đa gộp trong một aggregation
+MAX_WINDOW_HOURS = 24
+
+
+def _hour(dt: datetime) -> str:
+    return dt.strftime(HOUR_FORMAT)
+
+
+def _parse_hour(value: str) -> datetime:
+    return datetime.strptime(value, HOUR_FORMAT)
+
+
+async def _initial_watermark() -> str:
+    first = await audit_logs_db.find_one({}, {"created_at": 1}, sort=[("created_at", 1)])
+    if first and first.get("created_at"):
+        return first["created_at"][:13]
+    return _hour(datetime.utcnow())
+
+
+async def _rollup_hours(start: str, end: str) -> set:
+    """Recompute hourly buckets for [start, end); returns the days touched."""
+    rows = await audit_logs_db.aggregate([
+        {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+        {"$group": {
+            "_id": {
+                "user_id": "$user_id",
+                "action": "$action",
+                "bucket": {"$substr": ["$created_at", 0, 13]},
+            },
+            "count": {"$sum": 1},
+        }},
+    ], allowDiskUse=True).to_list(None)
+
+    ops = []
+    for row in rows:
+        key = row["_id"]
+        ops.append(UpdateOne(
+            {"_id": f"{key['bucket']}|{key.get('user_id')}|{key.get('action')}"},
+            {"$set": {
+                "bucket": key["bucket"],
+                "user_id": key.get("user_id"),
+                "action": key.get("action"),
+                "count": row["count"],
+            }},
+            upsert=True,
+        ))
+    if ops:
+        await hourly_db.bulk_write(ops, ordered=False)
+
+    return {row["_id"]["bucket"][:10] for row in rows}
+
+
+async def _rollup_days(days: set):
+    """Recompute daily buckets from the hourly ones."""
+    for day in sorted(days):
+        rows = await hourly_db.aggregate([
+            {"$match": {"bucket": {"$gte": day, "$lt": day + "~"}}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "action": "$action"},
+                "count": {"$sum": "$count"},
+            }},
+        ]).to_list(None)
+
+        ops = [
+            UpdateOne(
+                {"_id": f"{day}|{row['_id'].get('user_id')}|{row['_id'].get('action')}"},
+                {"$set": {
+                    "bucket": day,
+                    "user_id": row["_id"].get("user_id"),
+                    "action": row["_id"].get("action"),
+                    "count": row["count"],
+                }},
+                upsert=True,
+            )
+            for row in rows
+        ]
+        if ops:
+            await daily_db.bulk_write(ops, ordered=False)
+
+
+async def rollup_audit_logs():
+    state = await get_state(STATE_NAME)
+    watermark = state["watermark"] if state else await _initial_watermark()
+
+    # Chỉ gộp giờ đã kết thúc
+    limit = _hour(datetime.utcnow() - timedelta(seconds=AUDIT_ROLLUP_LAG_SECONDS))
+
+    while watermark < limit:
+        end = min(_hour(_parse_hour(watermark) + timedelta(hours=MAX_WINDOW_HOURS)), limit)
+        days = await _rollup_hours(watermark, end)
+        await _rollup_days(days)
+
+        watermark = end
+        await set_state(STATE_NAME, watermark=watermark)
+        logger.info(f"Audit rollup advanced to {watermark}")
+
+
+async def get_watermark() -> str | None:
+    state = await get_state(STATE_NAME)
+    return state["watermark"] if state else None
@@ -0,0 +1,177 @@
+# jobs/cascade_delete.py
+"""
+Xoá group và dữ liệu phụ thuộc của nó (member, task, comment, attachment,
+verification, notification) ở background. delete_group enqueue job trước
+khi xoá group, nên job tự xoá lại cả group / member (idempotent) phòng khi
+request chết giữa chừng.
+
+Job nằm trong collection_jobs. Worker claim job bằng lease
+(find_one_and_update), xoá theo batch giới hạn theo khoảng _id và nghỉ
+CASCADE_THROTTLE_MS giữa các batch để không dồn tải lên cluster. Checkpoint
+(_id task cuối đã xử lý) và progress được lưu sau mỗi batch nên job chạy
+tiếp được nếu process chết giữa chừng (lease hết hạn → worker khác nhận).
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from config.database import get_collection
+from config.settings import CASCADE_BATCH_SIZE, CASCADE_THROTTLE_MS, CASCADE_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+jobs_db = get_collection("collection_jobs")
+tasks_db = get_collection("collection_tasks")
+comments_db = get_collection("collection_task_comments")
+attachments_db = get_collection("collection_task_attachments")
+verifications_db = get_collection("collection_task_verifications")
+notifications_db = get_collection("collection_notifications")
+groups_db = get_collection("collection_groups")
+members_db = get_collection("collection_group_members")
+
+JOB_TYPE = "group_cascade"
+WORKER_ID = uuid.uuid4().hex
+
+
+def _format_datetime(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        return dt.isoformat() + "Z"
+    else:
+        return dt.isoformat().replace("+00:00", "Z")
+
+
+async def enqueue_group_cascade(group_id: str, requested_by: str) -> dict:
+    now = _format_datetime(datetime.utcnow())
+    job = {
+        "_id": f"job_{uuid.uuid4().hex}",
+        "type": JOB_TYPE,
+        "group_id": group_id,
+        "requested_by": requested_by,
+        "status": "pending",
+        "checkpoint": "",
+        "progress": {
+            "tasks": 0, "comments": 0, "attachments": 0,
+            "verifications": 0, "notifications": 0,
+        },
+        "lease_until": None,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None,
+    }
+    await jobs_db.insert_one(job)
+    return job
+
+
+async def _throttle():
+    if CASCADE_THROTTLE_MS:
+        await asyncio.sleep(CASCADE_THROTTLE_MS / 1000)
+
+
+async def _claim() -> dict | None:
+    now = datetime.utcnow()
+    return await jobs_db.find_one_and_update(
+        {
+            "type": JOB_TYPE,
+            "status": {"$in": ["pending", "running"]},
+            "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+        },
+        {"$set": {
+            "status": "running",
+            "worker": WORKER_ID,
+            "lease_until": now + timedelta(seconds=CASCADE_LEASE_SECONDS),
+        }},
+        sort=[("created_at", 1)],
+        return_document=True,
+    )
+
+
+def _owned(job_id: str) -> dict:
+    """Filter của mọi lần ghi lên job: sau khi lease bị worker khác nhận thì không ghi nữa."""
+    return {"_id": job_id, "worker": WORKER_ID}
+
+
+async def _heartbeat(job_id: str, **fields):
+    fields.setdefault("lease_until", datetime.utcnow() + timedelta(seconds=CASCADE_LEASE_SECONDS))
+    fields["updated_at"] = _format_datetime(datetime.utcnow())
+    await jobs_db.update_one(_owned(job_id), {"$set": fields})
+
+
+async def _delete_in_batches(collection, query: dict) -> int:
+    """Delete matching documents CASCADE_BATCH_SIZE _ids at a time."""
+    deleted = 0
+    while True:
+        ids = [d["_id"] async for d in collection.find(query, {"_id": 1}).sort("_id", 1).limit(CASCADE_BATCH_SIZE)]
+        if not ids:
+            return deleted
+        result = await collection.delete_many({"_id": {"$in": ids}})
+        deleted += result.deleted_count
+        if len(ids) < CASCADE_BATCH_SIZE:
+            return deleted
+        await _throttle()
+
+
+async def _run_job(job: dict):
+    job_id, group_id = job["_id"], job["group_id"]
+    checkpoint = job.get("checkpoint") or ""
+
+    await groups_db.delete_one({"group_id": group_id})
+    await _delete_in_batches(members_db, {"group_id": group_id})
+
+    while True:
+        batch = await tasks_db.find(
+            {"group_id": group_id, "_id": {"$gt": checkpoint}},
+            {"_id": 1, "task_id": 1},
+        ).sort("_id", 1).limit(CASCADE_BATCH_SIZE).to_list(None)
+
+        if not batch:
+            break
+
+        task_ids = [t["task_id"] for t in batch]
+        child_query = {"task_id": {"$in": task_ids}}
+
+        # Xoá con trước rồi mới xoá task, để crash giữa chừng không làm mất liên kết
+        counts = {
+            "comments": await _delete_in_batches(comments_db, child_query),
+            "attachments": await _delete_in_batches(attachments_db, child_query),
+            "verifications": await _delete_in_batches(verifications_db, child_query),
+        }
+        result = await tasks_db.delete_many({"_id": {"$in": [t["_id"] for t in batch]}})
+        counts["tasks"] = result.deleted_count
+
+        checkpoint = batch[-1]["_id"]
+        await jobs_db.update_one(
+            _owned(job_id),
+            {"$inc": {f"progress.{k}": v for k, v in counts.items()}},
+        )
+        await _heartbeat(job_id, checkpoint=checkpoint)
+        await _throttle()
+
+    notifications = await _delete_in_batches(notifications_db, {"group_id": group_id})
+    await jobs_db.update_one(_owned(job_id), {"$inc": {"progress.notifications": notifications}})
+
+    await _heartbeat(
+        job_id,
+        status="completed",
+        lease_until=None,
+        finished_at=_format_datetime(datetime.utcnow()),
+    )
+    logger.info(f"Cascade delete for group {group_id} finished (job {job_id})")
+
+
+async def run_cascade_jobs():
+    """Claim and run pending cascade jobs one at a time until none is left."""
+    while True:
+        job = await _claim()
+        if not job:
+            return
+        try:
+            await _run_job(job)
+        except asyncio.CancelledError:
+            # Shutdown: trả lease để worker khác nhận tiếp ngay
+            await jobs_db.update_one(_owned(job["_id"]), {"$set": {"lease_until": None}})
+            raise
+        except Exception as e:
+            logger.exception(f"Cascade job {job['_id']} failed")
+            await jobs_db.update_one(_owned(job["_id"]), {"$set": {"last_error": str(e)}})
+            return
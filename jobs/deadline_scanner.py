@@ -0,0 +1,135 @@
+# jobs/deadline_scanner.py
+"""
+Tìm task vừa bước vào cửa sổ "due trong 24h" hoặc "quá hạn" và ghi
+notification cho người liên quan.
+
+Trạng thái nằm trên từng task: due_soon_notified / overdue_notified là False
+cho tới khi notification của cửa sổ đó được ghi, và được đặt lại False khi
+update_task đổi due_date. Mỗi lần quét đọc các task còn cờ False có due_at
+<= mốc của cửa sổ (partial index {cờ, due_at}, chỉ chứa task chưa báo), theo
+batch. Task mới tạo / vừa dời hạn vào trong cửa sổ cũng được báo đúng một
+lần; dedupe_key unique (gồm cả due_at) chặn trùng nếu job chết giữa chừng.
+Cửa sổ quá hạn được quét trước và đánh dấu luôn due_soon_notified, nên task
+tạo / dời hạn khi đã quá hạn chỉ nhận notification "overdue".
+Task tạo trước khi có cờ cần chạy scripts/backfill_task_fields.py.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from config.database import get_collection
+from config.settings import DEADLINE_SCAN_BATCH_SIZE, DUE_SOON_HOURS
+
+logger = logging.getLogger(__name__)
+
+tasks_db = get_collection("collection_tasks")
+group_members_db = get_collection("collection_group_members")
+notifications_db = get_collection("collection_notifications")
+
+OPEN_TASK = {"is_completed": {"$ne": True}, "status": {"$ne": "archived"}}
+
+# Cửa sổ → cờ trên task
+NOTIFIED_FIELDS = {"due_soon": "due_soon_notified", "overdue": "overdue_notified"}
+# Cờ đặt True sau khi báo: đã quá hạn thì không còn báo "sắp đến hạn"
+MARKS = {"due_soon": ("due_soon_notified",), "overdue": ("overdue_notified", "due_soon_notified")}
+
+
+def _format_datetime(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        return dt.isoformat() + "Z"
+    else:
+        return dt.isoformat().replace("+00:00", "Z")
+
+
+async def _recipients(tasks: list) -> dict:
+    """task_id -> set of wallets to notify (owner of personal tasks, all members of group tasks)."""
+    group_ids = {t["group_id"] for t in tasks if t.get("group_id")}
+    members_by_group: dict[str, set] = {}
+    if group_ids:
+        async for m in group_members_db.find(
+            {"group_id": {"$in": list(group_ids)}},
+            {"group_id": 1, "wallet_address": 1},
+        ):
+            members_by_group.setdefault(m["group_id"], set()).add(m["wallet_address"])
+
+    recipients = {}
+    for t in tasks:
+        if t.get("group_id"):
+            wallets = set(members_by_group.get(t["group_id"], ()))
+        else:
+            wallets = set()
+        if t.get("wallet_address"):
+            wallets.add(t["wallet_address"].lower())
+        recipients[t["task_id"]] = wallets
+    return recipients
+
+
+async def _notify(kind: str, tasks: list):
+    recipients = await _recipients(tasks)
+    now = _format_datetime(datetime.utcnow())
+
+    ops = []
+    for t in tasks:
+        for wallet in recipients[t["task_id"]]:
+            # Gồm due_at: dời hạn thì được báo lại cho hạn mới
+            dedupe_key = f"{kind}:{t['task_id']}:{_format_datetime(t['due_at'])}:{wallet}"
+            ops.append(UpdateOne(
+                {"dedupe_key": dedupe_key},
+                {"$setOnInsert": {
+                    "_id": f"ntf_{uuid.uuid4().hex}",
+                    "dedupe_key": dedupe_key,
+                    "wallet_address": wallet,
+                    "kind": kind,
+                    "task_id": t["task_id"],
+                    "group_id": t.get("group_id"),
+                    "title": t.get("title"),
+                    "due_date": t.get("due_date"),
+                    "read": False,
+                    "created_at": now,
+                }},
+                upsert=True,
+            ))
+
+    if ops:
+        await notifications_db.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def scan_window(kind: str, upper_bound: datetime) -> int:
+    """
+    Notify every open task with due_at <= `upper_bound` that has not been
+    notified for this window yet. Returns the number of tasks handled.
+    """
+    flag = NOTIFIED_FIELDS[kind]
+    handled = 0
+    while True:
+        batch = await tasks_db.find(
+            {flag: False, "due_at": {"$lte": upper_bound}, **OPEN_TASK},
+            {"_id": 1, "task_id": 1, "title": 1, "group_id": 1,
+             "wallet_address": 1, "due_date": 1, "due_at": 1},
+        ).sort([("due_at", 1), ("_id", 1)]).limit(DEADLINE_SCAN_BATCH_SIZE).to_list(None)
+
+        if not batch:
+            return handled
+
+        await _notify(kind, batch)
+        handled += len(batch)
+
+        # Chỉ đánh dấu nếu due_at chưa bị đổi trong lúc quét (đổi rồi thì lần sau báo theo hạn mới)
+        await tasks_db.bulk_write([
+            UpdateOne({"_id": t["_id"], "due_at": t["due_at"]}, {"$set": dict.fromkeys(MARKS[kind], True)})
+            for t in batch
+        ], ordered=False)
+
+        if len(batch) < DEADLINE_SCAN_BATCH_SIZE:
+            return handled
+
+
+async def run_deadline_scan():
+    now = datetime.utcnow()
+    overdue = await scan_window("overdue", now)
+    due_soon = await scan_window("due_soon", now + timedelta(hours=DUE_SOON_HOURS))
+    if due_soon or overdue:
+        logger.info(f"Deadline scan: {due_soon} due soon, {overdue} overdue")
@@ -0,0 +1,84 @@
+# jobs/reconcile_group_counters.py
+"""
+Đối soát member_count / task_count / open_task_count trên group với
+collection_group_members và collection_tasks, sửa các group bị lệch (ví dụ
+process chết giữa lần ghi task và lần $inc counter).
+
+Chạy định kỳ từ app lifespan, hoặc một lần để backfill group cũ:
+
+    python -m jobs.reconcile_group_counters
+"""
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from config.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+groups_db = get_collection("collection_groups")
+group_members_db = get_collection("collection_group_members")
+tasks_db = get_collection("collection_tasks")
+
+COUNTER_FIELDS = ("member_count", "task_count", "open_task_count")
+
+
+async def _actual_counts(group_ids: list) -> dict:
+    counts = {gid: {field: 0 for field in COUNTER_FIELDS} for gid in group_ids}
+
+    async for row in group_members_db.aggregate([
+        {"$match": {"group_id": {"$in": group_ids}}},
+        {"$group": {"_id": "$group_id", "n": {"$sum": 1}}},
+    ]):
+        counts[row["_id"]]["member_count"] = row["n"]
+
+    async for row in tasks_db.aggregate([
+        {"$match": {"group_id": {"$in": group_ids}}},
+        {"$group": {
+            "_id": "$group_id",
+            "total": {"$sum": 1},
+            # task mở: giống OPEN_TASK của jobs/deadline_scanner.py
+            "open": {"$sum": {"$cond": [{"$and": [
+                {"$ne": ["$is_completed", True]},
+                {"$ne": ["$status", "archived"]},
+            ]}, 1, 0]}},
+        }},
+    ]):
+        counts[row["_id"]]["task_count"] = row["total"]
+        counts[row["_id"]]["open_task_count"] = row["open"]
+
+    return counts
+
+
+async def _reconcile_batch(groups: list) -> int:
+    actual = await _actual_counts([g["group_id"] for g in groups])
+    ops = []
+    for group in groups:
+        expected = actual[group["group_id"]]
+        if any(group.get(field) != expected[field] for field in COUNTER_FIELDS):
+            ops.append(UpdateOne({"_id": group["_id"]}, {"$set": expected}))
+    if ops:
+        await groups_db.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def reconcile_group_counters():
+    fixed = 0
+    batch = []
+    async for group in groups_db.find({}, {"group_id": 1, **{f: 1 for f in COUNTER_FIELDS}}):
+        batch.append(group)
+        if len(batch) >= BATCH_SIZE:
+            fixed += await _reconcile_batch(batch)
+            batch = []
+    if batch:
+        fixed += await _reconcile_batch(batch)
+
+    if fixed:
+        logger.warning(f"Reconciled counters on {fixed} group(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_group_counters())
@@ -0,0 +1,111 @@
+# jobs/reconcile_task_counters.py
+"""
+Đối soát attachment_count / verification_count (và bản theo user) trên task
+với collection con, sửa các task bị lệch.
+
+Chạy định kỳ từ app lifespan, hoặc một lần để backfill dữ liệu cũ:
+
+    python -m jobs.reconcile_task_counters
+"""
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from config.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+tasks_db = get_collection("collection_tasks")
+
+COUNTERS = {
+    "attachment": get_collection("collection_task_attachments"),
+    "verification": get_collection("collection_task_verifications"),
+}
+
+
+def _counts_pipeline(match: dict | None = None) -> list:
+    pipeline = [{"$match": match}] if match else []
+    return pipeline + [
+        {"$group": {"_id": {"task_id": "$task_id", "user_id": "$user_id"}, "n": {"$sum": 1}}},
+        {"$group": {
+            "_id": "$_id.task_id",
+            "total": {"$sum": "$n"},
+            "by_user": {"$push": {"k": "$_id.user_id", "v": "$n"}},
+        }},
+    ]
+
+
+async def _apply(prefix: str, actual: dict) -> int:
+    """actual: task_id -> (total, by_user). Write only tasks whose counters drifted."""
+    total_field, by_user_field = f"{prefix}_count", f"{prefix}_counts_by_user"
+    ops = []
+    async for task in tasks_db.find(
+        {"task_id": {"$in": list(actual)}},
+        {"task_id": 1, total_field: 1, by_user_field: 1},
+    ):
+        total, by_user = actual[task["task_id"]]
+        if task.get(total_field, 0) != total or task.get(by_user_field, {}) != by_user:
+            ops.append(UpdateOne(
+                {"_id": task["_id"]},
+                {"$set": {total_field: total, by_user_field: by_user}},
+            ))
+    if ops:
+        await tasks_db.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def _reconcile(prefix: str, children) -> int:
+    fixed = 0
+
+    # 1. Task có document con: so counter với số thật
+    batch = {}
+    async for row in children.aggregate(_counts_pipeline(), allowDiskUse=True):
+        if row["_id"] is None:
+            continue
+        by_user = {u["k"]: u["v"] for u in row["by_user"] if u["k"]}
+        batch[row["_id"]] = (row["total"], by_user)
+        if len(batch) >= BATCH_SIZE:
+            fixed += await _apply(prefix, batch)
+            batch = {}
+    if batch:
+        fixed += await _apply(prefix, batch)
+
+    # 2. Task có counter > 0 nhưng document con đã mất
+    total_field = f"{prefix}_count"
+    cursor = tasks_db.find({total_field: {"$gt": 0}}, {"task_id": 1}, batch_size=BATCH_SIZE)
+    task_ids = []
+    async for task in cursor:
+        task_ids.append(task["task_id"])
+        if len(task_ids) >= BATCH_SIZE:
+            fixed += await _reset_orphans(prefix, children, task_ids)
+            task_ids = []
+    if task_ids:
+        fixed += await _reset_orphans(prefix, children, task_ids)
+
+    return fixed
+
+
+async def _reset_orphans(prefix: str, children, task_ids: list) -> int:
+    existing = set(await children.distinct("task_id", {"task_id": {"$in": task_ids}}))
+    missing = [t for t in task_ids if t not in existing]
+    if not missing:
+        return 0
+    result = await tasks_db.update_many(
+        {"task_id": {"$in": missing}},
+        {"$set": {f"{prefix}_count": 0, f"{prefix}_counts_by_user": {}}},
+    )
+    return result.modified_count
+
+
+async def reconcile_task_counters():
+    for prefix, children in COUNTERS.items():
+        fixed = await _reconcile(prefix, children)
+        if fixed:
+            logger.warning(f"Reconciled {prefix} counters on {fixed} task(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_task_counters())
@@ -0,0 +1,95 @@
+# jobs/scheduler.py
+import asyncio
+import fcntl
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+_tasks: dict[str, asyncio.Task] = {}
+# set() khi shutdown: job đang chạy dở được chạy nốt vòng hiện tại
+_stopping: asyncio.Event | None = None
+# giữ file lock leader tới khi process thoát
+_leader_lock = None
+
+
+async def _sleep_or_stop(seconds: float) -> bool:
+    """Sleep; returns True if shutdown was requested in the meantime."""
+    try:
+        await asyncio.wait_for(_stopping.wait(), seconds)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def _run_periodic(name: str, func: Callable[[], Awaitable], interval: float, initial_delay: float):
+    if initial_delay and await _sleep_or_stop(initial_delay):
+        return
+    while not _stopping.is_set():
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Background job {name} failed")
+        if await _sleep_or_stop(interval):
+            return
+
+
+def start_periodic(name: str, func: Callable[[], Awaitable], interval: float, initial_delay: float = 0):
+    """Run `func` every `interval` seconds on the event loop until stop_all()."""
+    global _stopping
+    if name in _tasks and not _tasks[name].done():
+        return
+    if _stopping is None:
+        _stopping = asyncio.Event()
+    _tasks[name] = asyncio.create_task(
+        _run_periodic(name, func, interval, initial_delay), name=f"job:{name}"
+    )
+
+
+async def start_when_leader(lock_path: str, start_jobs: Callable[[], None], retry: float = 30):
+    """
+    Nhiều worker trên cùng máy (gunicorn): chỉ worker giữ được file lock
+    mới chạy job nền. Worker khác thử lại mỗi `retry` giây, nên khi leader
+    chết (lock tự nhả) sẽ có worker khác nhận thay.
+    """
+    global _leader_lock
+    while True:
+        f = open(lock_path, "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            await asyncio.sleep(retry)
+            continue
+        _leader_lock = f
+        logger.info(f"Acquired {lock_path}, starting background jobs in this worker")
+        start_jobs()
+        return
+
+
+async def stop_all(drain_timeout: float = 0):
+    """
+    Stop every job. Iterations already running get up to `drain_timeout`
+    seconds to finish (so a batch is not cut in half); the rest is cancelled.
+    """
+    global _stopping, _leader_lock
+    tasks = list(_tasks.values())
+    _tasks.clear()
+
+    if _stopping is not None:
+        _stopping.set()
+
+    pending = tasks
+    if tasks and drain_timeout > 0:
+        _, pending = await asyncio.wait(tasks, timeout=drain_timeout)
+
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    _stopping = None
+    if _leader_lock is not None:
+        _leader_lock.close()
+        _leader_lock = None
@@ -0,0 +1,12 @@
+# jobs/state.py
+from config.database import get_collection
+
+job_state_db = get_collection("collection_job_state")
+
+
+async def get_state(name: str) -> dict | None:
+    return await job_state_db.find_one({"_id": name})
+
+
+async def set_state(name: str, **fields):
+    await job_state_db.update_one({"_id": name}, {"$set": fields}, upsert=True)
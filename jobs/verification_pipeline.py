@@ -0,0 +1,105 @@
+# jobs/verification_pipeline.py
+"""
+Kiểm tra chữ ký của task verification theo batch.
+
+Verification mới được lưu với signature_valid = None (đang chờ). Job định kỳ
+lấy các document đang chờ, recover chữ ký song song trên process pool (cùng
+logic utils.crypto.verify_signature) rồi ghi kết quả bằng một bulk_write.
+POST /tasks/verifications/batch dùng cùng pipeline cho reviewer.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from config.database import get_collection
+from config.settings import VERIFY_BATCH_SIZE, VERIFY_POOL_WORKERS
+from utils import crypto
+
+logger = logging.getLogger(__name__)
+
+verifications_db = get_collection("collection_task_verifications")
+
+# Số chữ ký mỗi lần gửi sang process con (giảm overhead pickle/IPC)
+CHUNK_SIZE = 64
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _format_datetime(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        return dt.isoformat() + "Z"
+    else:
+        return dt.isoformat().replace("+00:00", "Z")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: không fork process đang chạy event loop + thread của Motor
+        _pool = ProcessPoolExecutor(
+            max_workers=VERIFY_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=crypto.preload,
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def verify_documents(docs: list) -> list:
+    """Recover every signature in parallel; returns one bool per document."""
+    if not docs:
+        return []
+
+    items = [(d.get("wallet_address", ""), d.get("message", ""), d.get("signature", "")) for d in docs]
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+
+    chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    results = await asyncio.gather(*(
+        loop.run_in_executor(pool, crypto.verify_signatures, chunk) for chunk in chunks
+    ))
+    return [valid for chunk in results for valid in chunk]
+
+
+async def store_results(docs: list, results: list):
+    now = _format_datetime(datetime.utcnow())
+    ops = [
+        UpdateOne(
+            {"_id": d["_id"]},
+            {"$set": {"signature_valid": valid, "signature_checked_at": now}},
+        )
+        for d, valid in zip(docs, results)
+    ]
+    if ops:
+        await verifications_db.bulk_write(ops, ordered=False)
+
+
+async def process_pending_verifications():
+    """Drain the queue of unchecked verifications, VERIFY_BATCH_SIZE at a time."""
+    while True:
+        docs = await verifications_db.find(
+            {"signature_valid": None},
+            {"_id": 1, "wallet_address": 1, "message": 1, "signature": 1},
+        ).limit(VERIFY_BATCH_SIZE).to_list(None)
+
+        if not docs:
+            return
+
+        results = await verify_documents(docs)
+        await store_results(docs, results)
+
+        invalid = results.count(False)
+        logger.info(f"Checked {len(docs)} verification signature(s), {invalid} invalid")
+
+        if len(docs) < VERIFY_BATCH_SIZE:
+            return
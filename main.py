@@ -1,28 +1,95 @@
+import asyncio
+import logging
 import os
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from routes import auth_routes, user_routes, task_routes,group_routes,group_member_routes,task_comment_routes,attachment_verification_rouytes, community_challenge
+from routes import auth_routes, user_routes, task_routes,group_routes,group_member_routes,task_comment_routes,attachment_verification_rouytes, community_challenge, notification_routes, job_routes, metrics_routes, audit_routes
+from utils import crypto
+from utils.challenge_store import get_challenge_store
+from utils.event_hub import event_hub
+from config.indexes import ensure_indexes
+from config.rate_limits import RATE_LIMIT_ENABLED
+from middleware.rate_limit import RateLimitMiddleware
+from middleware.compression import CompressionMiddleware
+from middleware.request_id import RequestIdMiddleware
+from middleware.idempotency import IdempotencyMiddleware
+from utils.log import setup_logging, shutdown_logging
+from config.settings import DEADLINE_SCAN_INTERVAL, CASCADE_POLL_INTERVAL, RECONCILE_COUNTERS_INTERVAL, VERIFY_INTERVAL, ANCHOR_INTERVAL, AUDIT_ROLLUP_INTERVAL, AUDIT_ARCHIVE_INTERVAL, COMPRESSION_ENABLED, JOBS_LOCK_FILE, SHUTDOWN_DRAIN_SECONDS
+from config.database import reset_client
+from jobs import scheduler
+from jobs.deadline_scanner import run_deadline_scan
+from jobs.cascade_delete import run_cascade_jobs
+from jobs.reconcile_task_counters import reconcile_task_counters
+from jobs.reconcile_group_counters import reconcile_group_counters
+from jobs.verification_pipeline import process_pending_verifications, shutdown_pool
+from jobs.anchor_verifications import anchor_verifications
+from jobs.audit_rollup import rollup_audit_logs
+from jobs.audit_retention import archive_audit_logs
 
-app = FastAPI(title="Web3 Auth + Users API")
+logger = logging.getLogger(__name__)
 
-allowed_origins = os.getenv("ALLOWED_ORIGINS", "").split(",")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def start_background_jobs():
+    scheduler.start_periodic("deadline_scanner", run_deadline_scan, DEADLINE_SCAN_INTERVAL, initial_delay=10)
+    scheduler.start_periodic("cascade_delete", run_cascade_jobs, CASCADE_POLL_INTERVAL)
+    scheduler.start_periodic("reconcile_task_counters", reconcile_task_counters,
+                             RECONCILE_COUNTERS_INTERVAL, initial_delay=60)
+    scheduler.start_periodic("reconcile_group_counters", reconcile_group_counters,
+                             RECONCILE_COUNTERS_INTERVAL, initial_delay=90)
+    scheduler.start_periodic("verification_pipeline", process_pending_verifications,
+                             VERIFY_INTERVAL, initial_delay=15)
+    scheduler.start_periodic("anchor_verifications", anchor_verifications,
+                             ANCHOR_INTERVAL, initial_delay=120)
+    scheduler.start_periodic("audit_rollup", rollup_audit_logs, AUDIT_ROLLUP_INTERVAL, initial_delay=30)
+    scheduler.start_periodic("audit_retention", archive_audit_logs, AUDIT_ARCHIVE_INTERVAL, initial_delay=300)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chạy trong từng worker process (sau fork), không phải lúc import
+    setup_logging()
+
+    # Load eth_account ở background sau khi server đã nhận request,
+    # để cold start không phải chờ stack web3
+    if os.getenv("CRYPTO_PRELOAD", "1") != "0":
+        threading.Thread(target=crypto.preload, name="crypto-preload", daemon=True).start()
+
+    await get_challenge_store().start()
+    await event_hub.start()
+
+    # Không chặn startup chờ Mongo
+    index_task = asyncio.create_task(ensure_indexes())
+
+    # Nhiều worker: chỉ một worker (giữ JOBS_LOCK_FILE) chạy job nền
+    leader_task = None
+    if JOBS_LOCK_FILE:
+        leader_task = asyncio.create_task(scheduler.start_when_leader(JOBS_LOCK_FILE, start_background_jobs))
+    else:
+        start_background_jobs()
+
+    yield
+
+    # Graceful shutdown: job đang chạy được chạy nốt batch hiện tại
+    index_task.cancel()
+    if leader_task is not None:
+        leader_task.cancel()
+    await scheduler.stop_all(drain_timeout=SHUTDOWN_DRAIN_SECONDS)
+    shutdown_pool()
+    await get_challenge_store().stop()
+    await event_hub.stop()
+    reset_client()
+    # Sau cùng: log của các bước shutdown ở trên cũng được ghi
+    await shutdown_logging()
+
 
-@app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    # Log chi tiết lỗi
-    print(f"Validation error for request: {request.url}")
-    print(f"Validation errors: {exc.errors()}")
-    
+    logger.info(f"Validation error on {request.method} {request.url.path}: {len(exc.errors())} error(s)")
+    logger.debug(f"Validation errors: {exc.errors()}")
+
     return JSONResponse(
         status_code=422,
         content={
@@ -31,18 +98,64 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         },
     )
 
-@app.get("/", include_in_schema=False)
-@app.head("/", include_in_schema=False)
+
 def root():
     return {"message": "API is running 🚀"}
 
-app.include_router(auth_routes.router)
-app.include_router(user_routes.router)
-app.include_router(task_routes.router)
-app.include_router(group_routes.router)
-app.include_router(group_member_routes.router) 
-app.include_router(task_comment_routes.router)
 
-app.include_router(attachment_verification_rouytes.router)
-app.include_router(community_challenge.router)
+def create_app() -> FastAPI:
+    """
+    App factory. Không mở kết nối hay tạo task nào ở đây: tài nguyên của
+    từng process (Mongo client, job nền, process pool) được tạo trong
+    lifespan hoặc lazily ở lần dùng đầu, nên an toàn với gunicorn
+    preload_app / nhiều worker.
+    """
+    app = FastAPI(title="Web3 Auth + Users API", lifespan=lifespan)
+
+    allowed_origins = os.getenv("ALLOWED_ORIGINS", "").split(",")
+
+    # Trong cùng: chỉ request đã qua rate limit mới chạm tới store idempotency
+    app.add_middleware(IdempotencyMiddleware)
+
+    # Thêm trước CORS để response 429 vẫn có header CORS
+    if RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Thêm sau cùng = lớp ngoài cùng, nén cả response của các middleware khác
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+
+    # Ngoài cùng: log của mọi middleware bên trong đều có request_id
+    app.add_middleware(RequestIdMiddleware)
+
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+
+    app.add_api_route("/", root, methods=["GET", "HEAD"], include_in_schema=False)
+
+    app.include_router(auth_routes.router)
+    app.include_router(user_routes.router)
+    app.include_router(task_routes.router)
+    app.include_router(group_routes.router)
+    app.include_router(group_member_routes.router)
+    app.include_router(task_comment_routes.router)
+
+    app.include_router(attachment_verification_rouytes.router)
+    app.include_router(community_challenge.router)
+    app.include_router(notification_routes.router)
+    app.include_router(job_routes.router)
+    app.include_router(metrics_routes.router)
+    app.include_router(audit_routes.router)
+
+    return app
+
 
+# uvicorn main:app (1 process) / gunicorn -c gunicorn.conf.py main:app
+app = create_app()
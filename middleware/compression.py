@@ -0,0 +1,227 @@
+# middleware/compression.py
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from config.settings import (
+    COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_ZSTD_LEVEL, COMPRESSION_CACHE_BYTES, COMPRESSION_THREAD_MIN_SIZE,
+)
+from utils.metrics import metrics
+
+# brotli / zstandard có trong requirements.txt; thiếu thì vẫn chạy, chỉ negotiate gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Thứ tự ưu tiên khi client chấp nhận nhiều encoding với cùng q
+PREFERENCE = [e for e, available in (("br", brotli), ("zstd", zstandard), ("gzip", True)) if available]
+
+# SSE phải tới client ngay từng event; ảnh / file nén sẵn thì nén lại vô ích
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip",
+                      "application/gzip", "application/octet-stream")
+
+# Response body lớn hơn mức này không được lưu vào cache
+MAX_CACHEABLE_BODY = 1024 * 1024
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    q_values = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            q_values[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in PREFERENCE:
+        q = q_values.get(encoding, q_values.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor for streaming bodies."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self._compress, self._finish = self._c.process, self._c.finish
+        elif encoding == "zstd":
+            self._c = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+            self._compress, self._finish = self._c.compress, self._c.flush
+        else:
+            self._c = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress, self._finish = self._c.compress, self._c.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies keyed by (encoding, blake2b(body)), bounded by
+    total bytes. Identical responses (cached profiles, stats, lists that did
+    not change) are compressed once and then only hashed.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._data: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+    @staticmethod
+    def key(body: bytes, encoding: str) -> tuple:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple) -> bytes | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: bytes):
+        if self.max_bytes <= 0 or len(value) > self.max_bytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._data[key] = value
+        self._size += len(value)
+        while self._size > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self._size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated br / zstd / gzip compression. Complete bodies smaller than
+    COMPRESSION_MIN_SIZE are sent as-is; larger ones go through the
+    compressed-body cache, and from COMPRESSION_THREAD_MIN_SIZE on they are
+    compressed in the threadpool so big payloads do not stall the event
+    loop. Streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, cache_bytes: int = COMPRESSION_CACHE_BYTES,
+                 thread_min_size: int = COMPRESSION_THREAD_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+        self.cache = CompressedBodyCache(cache_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        streamer = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start, streamer, passthrough
+
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or content_type.startswith(SKIP_CONTENT_TYPES)
+                    or message["status"] in (204, 304)
+                ):
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if streamer is None and start is not None:
+                if not more_body:
+                    # Body trọn vẹn trong một message
+                    await self._send_complete(start, body, encoding, send)
+                    start = None
+                    return
+
+                streamer = StreamCompressor(encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+                await send(start)
+                start = None
+                metrics.inc("compression_responses", encoding=encoding, mode="stream")
+
+            data = streamer.compress(body) if body else b""
+            if not more_body:
+                data += streamer.finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, wrapped_send)
+
+    async def _send_complete(self, start: dict, body: bytes, encoding: str, send):
+        headers = MutableHeaders(raw=start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+
+        if len(body) < self.minimum_size:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        cacheable = len(body) <= MAX_CACHEABLE_BODY
+        key = self.cache.key(body, encoding) if cacheable else None
+        compressed = self.cache.get(key) if cacheable else None
+        if compressed is None:
+            if len(body) >= self.thread_min_size:
+                compressed = await run_in_threadpool(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            if cacheable:
+                self.cache.set(key, compressed)
+            metrics.inc("compression_responses", encoding=encoding, mode="compressed")
+        else:
+            metrics.inc("compression_responses", encoding=encoding, mode="cached")
+        metrics.inc("compression_bytes_saved", len(body) - len(compressed))
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        await send(start)
+        await send({"type": "http.response.body", "body": compressed})
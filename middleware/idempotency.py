@@ -0,0 +1,137 @@
+# middleware/idempotency.py
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from utils.idempotency import IdempotencyStore, IdempotencyConflict, StoredResponse, fingerprint
+from utils.jwt import decode_access_token
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Create endpoint mà client mobile retry khi timeout
+IDEMPOTENT_ROUTES = {
+    ("POST", "/tasks"),
+    ("POST", "/comments"),
+    ("POST", "/groups"),
+    ("POST", "/community-challenges"),
+}
+
+# Header của response gốc được lưu lại để replay
+STORED_HEADERS = (b"content-type", b"location")
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key cho các route trong IDEMPOTENT_ROUTES. Key được scope
+    theo wallet (JWT) và route; request không có key hoặc chưa đăng nhập đi
+    thẳng vào app. Chỉ response cuối cùng (2xx / 4xx) được lưu; redirect
+    (vd. 307 /tasks → /tasks/) và 5xx giải phóng key để request sau chạy thật.
+    """
+
+    def __init__(self, app, store: IdempotencyStore | None = None):
+        self.app = app
+        self.store = store or IdempotencyStore()
+
+    @staticmethod
+    def _wallet(headers: Headers) -> str | None:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        payload = decode_access_token(token)
+        return payload.get("wallet_address") if payload else None
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks, more = [], True
+        while more:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        return b"".join(chunks)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"].rstrip("/")) not in IDEMPOTENT_ROUTES:
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(HEADER)
+        wallet = self._wallet(headers) if idempotency_key else None
+        if wallet is None:
+            return await self.app(scope, receive, send)
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse({"detail": "Idempotency-Key is too long"}, status_code=400)
+            return await response(scope, receive, send)
+
+        body = await self._read_body(receive)
+        # Path chính xác: /tasks và /tasks/ là hai request khác nhau (redirect)
+        path = scope["path"]
+        key = f"{wallet.lower()}|{scope['method']} {path}|{idempotency_key}"
+        request_fingerprint = fingerprint(scope["method"], path, body)
+
+        try:
+            stored = await self.store.begin(key, request_fingerprint)
+        except IdempotencyConflict as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+            return await response(scope, receive, send)
+
+        if stored is not None:
+            return await self._replay(stored, send)
+
+        await self._execute(scope, body, receive, send, key, request_fingerprint)
+
+    async def _execute(self, scope, body: bytes, receive, send, key: str, request_fingerprint: str):
+        sent_body = False
+
+        async def replay_receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = None
+        stored_headers = []
+        chunks = []
+        finished = False
+
+        async def capture_send(message):
+            nonlocal status, stored_headers, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                stored_headers = [(k, v) for k, v in message.get("headers", []) if k.lower() in STORED_HEADERS]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                finished = not message.get("more_body", False)
+            await send(message)
+
+        async def settle():
+            # Response đã tạo xong thì lưu, kể cả khi client đã ngắt kết nối
+            if not finished or not (200 <= status < 300 or 400 <= status < 500):
+                await self.store.abort(key)
+                return
+            await self.store.complete(key, StoredResponse(
+                fingerprint=request_fingerprint,
+                status=status,
+                headers=[(k.decode("latin-1"), v.decode("latin-1")) for k, v in stored_headers],
+                body=b"".join(chunks),
+            ))
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await settle()
+            raise
+        await settle()
+
+    @staticmethod
+    async def _replay(stored: StoredResponse, send):
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in stored.headers]
+        headers += [
+            (b"content-length", str(len(stored.body)).encode()),
+            (b"idempotent-replayed", b"true"),
+        ]
+        await send({"type": "http.response.start", "status": stored.status, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
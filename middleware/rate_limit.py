@@ -0,0 +1,122 @@
+# middleware/rate_limit.py
+import json
+import math
+import re
+
+from starlette.responses import JSONResponse
+
+from config.rate_limits import ROUTE_LIMITS, RATE_LIMIT_PROXY_HOPS
+from utils.jwt import decode_access_token
+from utils.metrics import metrics
+from utils.rate_limit import RateLimitBackend, InMemoryRateLimitBackend
+
+MAX_BODY_PEEK = 8 * 1024
+
+
+def _compile(template: str) -> re.Pattern:
+    pattern = re.sub(r"\{[^/]+\}", "[^/]+", template.rstrip("/"))
+    return re.compile(f"^{pattern}/?$")
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket rate limiting per route (config/rate_limits.py), keyed by
+    client IP and by wallet. Requests to routes without a configured limit
+    pass straight through.
+    """
+
+    def __init__(self, app, backend: RateLimitBackend | None = None, limits: dict | None = None):
+        self.app = app
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.routes: dict[str, list] = {}
+        for (method, template), limit in (limits or ROUTE_LIMITS).items():
+            self.routes.setdefault(method, []).append((_compile(template), template, limit))
+
+    def _match(self, method: str, path: str):
+        for pattern, template, limit in self.routes.get(method, ()):
+            if pattern.match(path):
+                return template, limit
+        return None, None
+
+    @staticmethod
+    def _client_ip(scope) -> str:
+        if RATE_LIMIT_PROXY_HOPS:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-forwarded-for":
+                    hops = [h.strip() for h in value.decode("latin-1").split(",") if h.strip()]
+                    if len(hops) >= RATE_LIMIT_PROXY_HOPS:
+                        return hops[-RATE_LIMIT_PROXY_HOPS]
+                    break
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def _wallet_from_token(scope) -> str | None:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    payload = decode_access_token(token)
+                    return payload.get("wallet_address") if payload else None
+        return None
+
+    @staticmethod
+    async def _peek_body(receive):
+        """Read the (small) request body and return it plus a replaying receive."""
+        chunks, size, more = [], 0, True
+        while more and size <= MAX_BODY_PEEK:
+            message = await receive()
+            if message["type"] != "http.request":
+                return None, receive
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more = message.get("more_body", False)
+
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": more}
+            return await receive()
+
+        return body, replay
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        template, limit = self._match(scope["method"], scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        keys = []
+        if "ip" in limit:
+            keys.append(("ip", f"ip:{self._client_ip(scope)}", limit["ip"]))
+
+        if "wallet" in limit:
+            wallet = self._wallet_from_token(scope)
+            if wallet is None and template.startswith("/auth/"):
+                body, receive = await self._peek_body(receive)
+                try:
+                    wallet = json.loads(body).get("wallet_address") if body else None
+                except (ValueError, AttributeError):
+                    wallet = None
+            if isinstance(wallet, str):
+                keys.append(("wallet", f"wallet:{wallet.lower()}", limit["wallet"]))
+
+        for kind, key, bucket_limit in keys:
+            allowed, retry_after = await self.backend.hit(f"{scope['method']} {template}|{key}", bucket_limit)
+            if not allowed:
+                metrics.inc("rate_limit_rejected", route=template, key=kind)
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+                return await response(scope, receive, send)
+
+        metrics.inc("rate_limit_allowed", route=template)
+        return await self.app(scope, receive, send)
@@ -0,0 +1,41 @@
+# middleware/request_id.py
+import re
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from utils.log import request_id_var
+
+HEADER = "X-Request-ID"
+
+# Chỉ nhận request id từ client / proxy nếu đủ "sạch" để ghi vào log
+_VALID_ID = re.compile(r"^[A-Za-z0-9._-]{8,64}$")
+
+
+class RequestIdMiddleware:
+    """
+    Gắn request id (lấy từ header X-Request-ID hoặc tạo mới) vào context
+    của request để mọi log trong request đó mang cùng id, và trả lại id
+    trong response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = Headers(scope=scope).get(HEADER, "")
+        request_id = incoming if _VALID_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def wrapped_send(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])[HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            request_id_var.reset(token)
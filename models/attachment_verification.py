@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -19,7 +19,7 @@ class TaskAttachmentResponse(BaseModel):
     file_size_bytes: int
     mime_type: Optional[str]
     uploaded_at: datetime
-    user: Optional[dict]
+    user: Optional[dict] = None
 
 class TaskVerificationCreate(BaseModel):
     message: str = Field(..., description="Message được ký: 'I completed task {task_id} at {timestamp}'")
@@ -37,3 +37,27 @@ class TaskVerificationResponse(BaseModel):
     verified_on_chain: bool
     tx_hash: Optional[str]
     verified_at: datetime
+    signature_valid: Optional[bool] = None
+
+
+class VerificationBatchRequest(BaseModel):
+    verification_ids: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class VerificationBatchResult(BaseModel):
+    verification_id: str
+    task_id: str
+    signature_valid: bool
+
+
+class VerificationProofResponse(BaseModel):
+    verification_id: str
+    task_id: str
+    batch_id: str
+    leaf: str
+    leaf_index: int
+    proof: List[str]
+    root: str
+    leaf_count: int
+    tx_hash: str
+    anchored_at: datetime
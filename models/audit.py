@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class AuditLogResponse(BaseModel):
+    id: str
+    user_id: Optional[str] = None
+    wallet_address: Optional[str] = None
+    action: str
+    target_id: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    created_at: str
+
+
+class AuditRollupResponse(BaseModel):
+    bucket: str
+    user_id: Optional[str] = None
+    action: Optional[str] = None
+    count: int
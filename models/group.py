@@ -1,6 +1,6 @@
 # models/group.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Dict
 from datetime import datetime
 
 class GroupBase(BaseModel):
@@ -23,4 +23,23 @@ class GroupResponse(GroupBase):
     group_id: str
     wallet_address: str
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+    member_count: int = 0
+    task_count: int = 0
+    open_task_count: int = 0
+
+class MyGroupResponse(GroupResponse):
+    role: str = "member"
+    joined_at: Optional[datetime] = None
+
+class GroupStatsResponse(BaseModel):
+    group_id: str
+    total_tasks: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    overdue_tasks: int
+    completion_rate: float
+    tasks_per_assignee: Dict[str, int]
+    estimated_hours: float
+    actual_hours: float
+    generated_at: datetime
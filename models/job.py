@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional, Dict
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    type: str
+    group_id: Optional[str] = None
+    status: str
+    progress: Dict[str, int]
+    created_at: str
+    updated_at: str
+    finished_at: Optional[str] = None
+    last_error: Optional[str] = None
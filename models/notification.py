@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class NotificationResponse(BaseModel):
+    _id: str
+    id: str
+    wallet_address: str
+    kind: str
+    task_id: str
+    group_id: Optional[str] = None
+    title: Optional[str] = None
+    due_date: Optional[str] = None
+    read: bool
+    created_at: str
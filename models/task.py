@@ -40,6 +40,9 @@ class TaskUpdate(BaseModel):
     due_date: Optional[datetime] = None
     metadata: Optional[Dict] = None
 
+    # Version client đã đọc; có thì update chỉ thành công nếu task chưa bị sửa (409)
+    version: Optional[int] = Field(None, ge=0)
+
 
 class TaskResponse(BaseModel):
     _id: str
@@ -64,3 +67,4 @@ class TaskResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime]
+    version: int = 0
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, Request
-from models.attachment_verification import TaskAttachmentCreate, TaskAttachmentResponse, TaskVerificationCreate, TaskVerificationResponse
+from models.attachment_verification import TaskAttachmentCreate, TaskAttachmentResponse, TaskVerificationCreate, TaskVerificationResponse, VerificationBatchRequest, VerificationBatchResult, VerificationProofResponse
 from controllers import task_controller
 from dependencies.auth import get_current_user 
 from typing import List
@@ -8,8 +8,8 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
 @router.post("/{task_id}/attachments", response_model=TaskAttachmentResponse)
-def upload_attachment(task_id: str, payload: TaskAttachmentCreate, request: Request, user: dict = Depends(get_current_user)):
-    attachment = task_controller.add_attachment(
+async def upload_attachment(task_id: str, payload: TaskAttachmentCreate, request: Request, user: dict = Depends(get_current_user)):
+    attachment = await task_controller.add_attachment(
         task_id=task_id,
         user=user,
         file_name=payload.file_name,
@@ -20,14 +20,23 @@ def upload_attachment(task_id: str, payload: TaskAttachmentCreate, request: Requ
     return attachment
 
 
+@router.post("/verifications/batch", response_model=List[VerificationBatchResult])
+async def validate_verifications_batch(
+    payload: VerificationBatchRequest,
+    user: dict = Depends(get_current_user),
+):
+    """Reviewer kiểm tra chữ ký của nhiều verification cùng lúc (song song trên process pool)"""
+    return await task_controller.validate_verifications(payload.verification_ids, user)
+
+
 @router.post("/{task_id}/verifications", response_model=TaskVerificationResponse)
-def verify_task(
+async def verify_task(
     task_id: str,
     payload: TaskVerificationCreate,
     request: Request,
     user: dict = Depends(get_current_user),  
 ):
-    verification = task_controller.add_verification(
+    verification = await task_controller.add_verification(
         task_id=task_id,
         user=user,
         message=payload.message,
@@ -36,10 +45,19 @@ def verify_task(
     )
     return verification
 
+@router.get("/{task_id}/verifications/{verification_id}/proof", response_model=VerificationProofResponse)
+async def get_verification_proof(
+    task_id: str,
+    verification_id: str,
+    user: dict = Depends(get_current_user)
+):
+    """Merkle proof của verification trong batch đã anchor on-chain"""
+    return await task_controller.get_verification_proof(task_id, verification_id, user)
+
 @router.get("/{task_id}/attachments", response_model=List[TaskAttachmentResponse])
-def get_attachments(
+async def get_attachments(
     task_id: str,
     request: Request,
     user: dict = Depends(get_current_user)
 ):
-    return task_controller.list_attachments(task_id, user)
\ No newline at end of file
+    return await task_controller.list_attachments(task_id, user)
\ No newline at end of file
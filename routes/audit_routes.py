@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from models.audit import AuditLogResponse, AuditRollupResponse
+from controllers import audit_controller
+from dependencies.auth import get_current_user
+
+router = APIRouter(prefix="/audit-logs", tags=["audit-logs"])
+
+
+@router.get("/", response_model=List[AuditLogResponse])
+async def list_audit_logs_route(
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    target_id: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO time, inclusive"),
+    until: Optional[str] = Query(None, description="ISO time, exclusive"),
+    before: Optional[str] = Query(None, description="created_at của dòng cuối trang trước"),
+    limit: int = Query(100, ge=1, le=500),
+    user=Depends(get_current_user)
+):
+    """Log thô — user thường chỉ xem được log của chính mình"""
+    return await audit_controller.query_logs(
+        user, user_id, action, target_id, since, until, before, limit
+    )
+
+
+@router.get("/rollups", response_model=List[AuditRollupResponse])
+async def audit_rollups_route(
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[str] = Query(None, description="bucket >= (YYYY-MM-DD hoặc YYYY-MM-DDTHH)"),
+    until: Optional[str] = Query(None, description="bucket <"),
+    limit: int = Query(1000, ge=1, le=5000),
+    user=Depends(get_current_user)
+):
+    """Số action theo giờ / ngày cho dashboard (đọc rollup, không quét log thô)"""
+    return await audit_controller.get_rollups(
+        user, granularity, user_id, action, since, until, limit
+    )
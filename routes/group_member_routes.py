@@ -9,14 +9,16 @@ from models.group_member import (
 )
 from controllers import group_member_controller
 from dependencies.auth import get_current_user
+from dependencies.authz import Perm, require
+from utils.projection import parse_fields, mongo_projection, projected_response
 
 router = APIRouter(prefix="/group-members", tags=["group-members"])
 
 
 @router.post("/", response_model=GroupMemberResponse, status_code=status.HTTP_201_CREATED)
-async def add_member_route(req: GroupMemberCreate):
+async def add_member_route(req: GroupMemberCreate, current_user=Depends(get_current_user)):
     """Owner/Admin thêm thành viên vào group"""
-    return await group_member_controller.add_member(req.dict())
+    return await group_member_controller.add_member(req.dict(), current_user)
 
 
 @router.post("/join", response_model=GroupMemberResponse, status_code=status.HTTP_201_CREATED)
@@ -32,9 +34,12 @@ async def join_group_route(group_id: str, current_user=Depends(get_current_user)
 @router.get("/{group_id}", response_model=List[GroupMemberResponse])
 async def list_members_route(
     group_id: str,
-    current_user=Depends(get_current_user)
+    fields: str | None = Query(None, description="Chỉ trả về các field này, vd. wallet_address,role"),
+    current_user=Depends(require(Perm.VIEW_TASK))
 ):
-    return await group_member_controller.get_members(group_id, current_user)
+    selected = parse_fields(fields, GroupMemberResponse)
+    members = await group_member_controller.get_members(group_id, current_user, mongo_projection(selected))
+    return projected_response(members, GroupMemberResponse, selected) if selected else members
 
 
 @router.patch("/by-wallet/{group_id}", response_model=GroupMemberResponse)
@@ -42,15 +47,18 @@ async def update_member_by_wallet_route(
     group_id: str,
     req: GroupMemberUpdate,
     wallet_address: str = Query(..., description="Wallet address of the member"),
+    current_user=Depends(get_current_user)
 ):
     """Cập nhật role của member qua group_id + wallet_address"""
     return await group_member_controller.update_member_by_wallet(
         group_id,
         wallet_address,
-        req.dict(exclude_unset=True)
+        req.dict(exclude_unset=True),
+        current_user
     )
 
 
 @router.delete("/{member_id}", status_code=status.HTTP_200_OK)
-async def delete_member_route(member_id: str):
-    return await group_member_controller.remove_member(member_id)
+async def delete_member_route(member_id: str, current_user=Depends(get_current_user)):
+    """Owner/Admin xoá thành viên, hoặc thành viên tự rời group"""
+    return await group_member_controller.remove_member(member_id, current_user)
@@ -1,9 +1,11 @@
 # routes/group_routes.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from models.group import GroupCreate, GroupUpdate, GroupResponse
-from controllers import group_controller
+from models.group import GroupCreate, GroupUpdate, GroupResponse, GroupStatsResponse, MyGroupResponse
+from controllers import group_controller, task_controller
 from dependencies.auth import get_current_user
+from utils.projection import parse_fields, mongo_projection, projected_response
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
@@ -21,12 +23,62 @@ async def create_group_route(
     )
 
 
+@router.get("/mine", response_model=List[MyGroupResponse])
+async def list_my_groups_route(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    fields: Optional[str] = Query(None, description="Chỉ trả về các field này, vd. group_id,name,role"),
+    user=Depends(get_current_user)
+):
+    """Các nhóm mà user là thành viên, kèm role, số member và số task (1 aggregation)"""
+    selected = parse_fields(fields, MyGroupResponse)
+    groups = await group_controller.list_my_groups(
+        user["wallet_address"], skip, limit, mongo_projection(selected)
+    )
+    return projected_response(groups, MyGroupResponse, selected) if selected else groups
+
+
 @router.get("/{group_id}", response_model=GroupResponse)
 async def get_group_route(group_id: str):
     """Lấy thông tin nhóm theo group_id (public: ai cũng xem được)"""
     return await group_controller.get_group(group_id)
 
 
+@router.get("/{group_id}/stats", response_model=GroupStatsResponse)
+async def group_stats_route(group_id: str, user=Depends(get_current_user)):
+    """Thống kê task của nhóm cho dashboard (1 aggregation) — chỉ thành viên"""
+    return await task_controller.get_group_stats(group_id, user)
+
+
+@router.get("/{group_id}/events")
+async def group_events_route(group_id: str, request: Request, user=Depends(get_current_user)):
+    """Server-Sent Events: task/comment của nhóm thay đổi → đẩy ngay, không cần poll"""
+    stream = await task_controller.group_events(group_id, request, user)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{group_id}/export")
+async def export_group_tasks_route(
+    group_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    user=Depends(get_current_user)
+):
+    """Export toàn bộ task của nhóm (NDJSON/CSV, stream từ cursor) — chỉ thành viên"""
+    chunks, media_type, filename = await task_controller.export_group_tasks(
+        group_id, user, format, gzip
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.put("/{group_id}", response_model=GroupResponse)
 async def update_group_route(
     group_id: str,
@@ -37,7 +89,7 @@ async def update_group_route(
     return await group_controller.update_group(
         group_id,
         updates.dict(exclude_unset=True),
-        user["wallet_address"]
+        user
     )
 
 
@@ -47,10 +99,7 @@ async def delete_group_route(
     user=Depends(get_current_user)
 ):
     """Xóa nhóm — chỉ owner mới có quyền"""
-    return await group_controller.delete_group(
-        group_id,
-        user["wallet_address"]
-    )
+    return await group_controller.delete_group(group_id, user)
 
 
 @router.get("/", response_model=List[GroupResponse])
@@ -58,17 +107,22 @@ async def list_groups_route(
     wallet_address: Optional[str] = None,
     wallet_addresses: Optional[List[str]] = Query(None),
     is_public: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Chỉ trả về các field này, vd. group_id,name"),
     user=Depends(get_current_user)
 ):
     """Liệt kê nhóm — có thể filter theo owner hoặc is_public"""
+    selected = parse_fields(fields, GroupResponse)
+    projection = mongo_projection(selected)
 
     if is_public:
-        return await group_controller.list_groups(None, True)
+        groups = await group_controller.list_groups(None, True, projection)
 
-    if wallet_addresses:
-        return await group_controller.list_groups_multi(wallet_addresses, is_public)
+    elif wallet_addresses:
+        groups = await group_controller.list_groups_multi(wallet_addresses, is_public, projection)
 
-    if wallet_address is None:
-        wallet_address = user["wallet_address"]
+    else:
+        if wallet_address is None:
+            wallet_address = user["wallet_address"]
+        groups = await group_controller.list_groups(wallet_address, is_public, projection)
 
-    return await group_controller.list_groups(wallet_address, is_public)
+    return projected_response(groups, GroupResponse, selected) if selected else groups
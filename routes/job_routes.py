@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from models.job import JobResponse
+from controllers import job_controller
+from dependencies.auth import get_current_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_route(job_id: str, user=Depends(get_current_user)):
+    """Trạng thái / tiến độ của job background (vd. cascade delete khi xoá group)"""
+    return await job_controller.get_job(job_id, user)
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from utils.metrics import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return metrics.snapshot()
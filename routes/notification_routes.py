@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from models.notification import NotificationResponse
+from controllers import notification_controller
+from dependencies.auth import get_current_user
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+
+@router.get("/", response_model=List[NotificationResponse])
+async def list_notifications_route(
+    unread_only: bool = False,
+    before: Optional[str] = Query(None, description="created_at của item cuối trang trước"),
+    limit: int = Query(50, ge=1, le=200),
+    user=Depends(get_current_user)
+):
+    """Thông báo của user hiện tại (deadline sắp tới / quá hạn), mới nhất trước"""
+    return await notification_controller.list_notifications(
+        user["wallet_address"], unread_only, before, limit
+    )
+
+
+@router.patch("/{notification_id}/read", response_model=NotificationResponse)
+async def mark_read_route(notification_id: str, user=Depends(get_current_user)):
+    return await notification_controller.mark_read(notification_id, user["wallet_address"])
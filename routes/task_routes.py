@@ -1,17 +1,19 @@
-from fastapi import APIRouter, Request, Depends
-from models.task import TaskCreate, TaskResponse
-from typing import List
+from fastapi import APIRouter, Request, Depends, Query
+from fastapi.responses import StreamingResponse
+from models.task import TaskCreate, TaskUpdate, TaskResponse
 from controllers import task_controller
 from dependencies.auth import get_current_user
+from utils.streaming import json_array_stream, prefetch
+from utils.projection import parse_fields, mongo_projection
+import logging
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+logger = logging.getLogger(__name__)
+
 @router.post("/", response_model=TaskResponse)
 async def create_task_route(req: TaskCreate, request: Request, user=Depends(get_current_user)):
-    print("🟢 DEBUG create_task_route:")
-    print(f"   user_id   = {user.get('user_id')}")
-    print(f"   wallet_id = {user.get('wallet_address')}")
-    print(f"   group_id  = {req.group_id if hasattr(req, 'group_id') else None}")
+    logger.debug(f"create_task user_id={user.get('user_id')} group_id={req.group_id}")
     return await task_controller.create_task(req, request, user)
 
 
@@ -20,19 +22,26 @@ async def get_task(task_id: str, user=Depends(get_current_user)):
     return await task_controller.get_task(task_id)
 
 
-@router.get("/", response_model=List[TaskResponse])
+@router.get("/", responses={200: {
+    "description": "JSON array of task documents streamed as stored (the TaskResponse fields "
+                   "without _id, or only those in ?fields=); not validated against TaskResponse.",
+}})
 async def list_tasks(
     wallet_address: str | None = None,
     user_id: str | None = None,
     group_id: str | None = None,
+    fields: str | None = Query(None, description="Chỉ trả về các field này, vd. title,status,due_date"),
     user=Depends(get_current_user)
 ):
-    raw_tasks = await task_controller.list_tasks(wallet_address, user_id, group_id)
-    return [TaskResponse(**t) for t in raw_tasks]
+    # Task đã lưu sẵn các field tính toán → stream thẳng từ cursor
+    projection = mongo_projection(parse_fields(fields, TaskResponse))
+    cursor = task_controller.list_tasks(wallet_address, user_id, group_id, projection=projection)
+    docs = await prefetch(cursor)
+    return StreamingResponse(json_array_stream(docs), media_type="application/json")
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-async def update_task_route(task_id: str, updates: dict, request: Request, user=Depends(get_current_user)):
+async def update_task_route(task_id: str, updates: TaskUpdate, request: Request, user=Depends(get_current_user)):
     return await task_controller.update_task(task_id, updates, request, user)
 
 
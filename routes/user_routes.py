@@ -1,13 +1,19 @@
 from typing import List
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from models.user import UserUpdateRequest, UserResponse
 from controllers import user_controller
+from utils.projection import parse_fields, projected_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/{wallet_address}", response_model=UserResponse)
-async def get_user(wallet_address: str):
-    return await user_controller.get_user(wallet_address)
+async def get_user(
+    wallet_address: str,
+    fields: str | None = Query(None, description="Chỉ trả về các field này, vd. display_name,profile_summary")
+):
+    selected = parse_fields(fields, UserResponse)
+    user = await user_controller.get_user(wallet_address, selected)
+    return projected_response(user, UserResponse, selected) if selected else user
 
 @router.put("/{wallet_address}", response_model=UserResponse)
 async def update_user(wallet_address: str, req: UserUpdateRequest):
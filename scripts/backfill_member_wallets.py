@@ -0,0 +1,48 @@
+# scripts/backfill_member_wallets.py
+"""
+One-off migration: lowercase wallet_address on group memberships and
+notifications written with the raw JWT wallet (group owners created before
+create_group normalised it), so /groups/mine, the profile summary and the
+permission lookups, which all match the lowercase form, find them again.
+Runs server-side as a single pipeline update per collection, and is
+idempotent.
+
+    python scripts/backfill_member_wallets.py [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.database import get_collection  # noqa: E402
+
+COLLECTIONS = ("collection_group_members", "collection_notifications")
+
+NOT_LOWERCASE = {
+    "wallet_address": {"$type": "string"},
+    "$expr": {"$ne": ["$wallet_address", {"$toLower": "$wallet_address"}]},
+}
+
+PIPELINE = [{"$set": {"wallet_address": {"$toLower": "$wallet_address"}}}]
+
+
+async def backfill(dry_run: bool = False):
+    for name in COLLECTIONS:
+        collection = get_collection(name)
+        pending = await collection.count_documents(NOT_LOWERCASE)
+        print(f"🔎 {name}: {pending} document(s) with a mixed-case wallet")
+
+        if dry_run or not pending:
+            continue
+
+        result = await collection.update_many(NOT_LOWERCASE, PIPELINE)
+        print(f"✨ {name}: normalised {result.modified_count} document(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.dry_run))
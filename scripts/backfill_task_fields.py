@@ -0,0 +1,89 @@
+# scripts/backfill_task_fields.py
+"""
+One-off migration: persist the derived task fields (status, is_completed,
+completed_at, color_code, created_at, updated_at, due_at, version) on
+documents written before they were computed at write time, and turn a null
+metadata into an empty object so updates can $set metadata.* paths.
+
+Also initialises the deadline scanner flags (due_soon_notified /
+overdue_notified): tasks already overdue are marked as notified so the
+scanner does not flood old tasks, tasks due later are picked up normally. Runs server-side as a single
+pipeline update, and is idempotent.
+
+    python scripts/backfill_task_fields.py [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from controllers.task_controller import tasks_db, PRIORITY_COLORS, DEFAULT_COLOR, _format_datetime  # noqa: E402
+
+NEEDS_BACKFILL = {"$or": [
+    {"status": {"$exists": False}},
+    {"is_completed": {"$exists": False}},
+    {"completed_at": {"$exists": False}},
+    {"color_code": {"$exists": False}},
+    {"created_at": {"$exists": False}},
+    {"updated_at": {"$exists": False}},
+    {"due_date": {"$type": "string"}, "due_at": {"$exists": False}},
+    {"version": {"$exists": False}},
+    {"due_soon_notified": {"$exists": False}},
+    {"overdue_notified": {"$exists": False}},
+    {"metadata": None},
+]}
+
+
+def build_pipeline(now: str) -> list:
+    is_completed = {"$eq": ["$status", "completed"]}
+    # due_at null (không có hạn) < mọi date nên cũng coi như đã báo
+    already_overdue = {"$lt": ["$due_at", "$$NOW"]}
+    return [
+        {"$set": {"status": {"$ifNull": ["$status", "pending"]}}},
+        {"$set": {
+            "is_completed": is_completed,
+            "completed_at": {"$cond": [is_completed, {"$ifNull": ["$completed_at", now]}, None]},
+            "color_code": {"$switch": {
+                "branches": [
+                    {"case": {"$eq": [{"$ifNull": ["$priority", "medium"]}, priority]}, "then": color}
+                    for priority, color in PRIORITY_COLORS.items()
+                ],
+                "default": DEFAULT_COLOR,
+            }},
+            "created_at": {"$ifNull": ["$created_at", now]},
+            "version": {"$ifNull": ["$version", 0]},
+            "metadata": {"$ifNull": ["$metadata", {}]},
+            "updated_at": {"$ifNull": ["$updated_at", {"$ifNull": ["$created_at", now]}]},
+            "due_at": {"$cond": [
+                {"$eq": [{"$type": "$due_date"}, "string"]},
+                {"$dateFromString": {"dateString": "$due_date", "onError": None, "onNull": None}},
+                None,
+            ]},
+        }},
+        {"$set": {
+            "due_soon_notified": {"$ifNull": ["$due_soon_notified", already_overdue]},
+            "overdue_notified": {"$ifNull": ["$overdue_notified", already_overdue]},
+        }},
+    ]
+
+
+async def backfill(dry_run: bool = False):
+    pending = await tasks_db.count_documents(NEEDS_BACKFILL)
+    print(f"🔎 {pending} task(s) missing derived fields")
+
+    if dry_run or not pending:
+        return
+
+    now = _format_datetime(datetime.utcnow())
+    result = await tasks_db.update_many(NEEDS_BACKFILL, build_pipeline(now))
+    print(f"✨ Backfilled {result.modified_count} task(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.dry_run))
@@ -0,0 +1,123 @@
+# scripts/bench_workers.py
+"""
+Benchmark throughput theo số worker: start gunicorn với 1..N worker, bắn tải
+bằng httpx async vào một endpoint rồi in req/s và p50/p99 cho từng mức.
+
+    python scripts/bench_workers.py                        # 1..available_cpus()
+    python scripts/bench_workers.py --max-workers 4 --path /groups/ --token $JWT
+    python scripts/bench_workers.py --duration 20 --concurrency 128
+
+Cách đo:
+  * mỗi mức worker chạy một server mới (JOBS_LOCK_FILE riêng); tắt rate
+    limit và crypto preload để chỉ đo request path;
+  * warmup vài giây trước khi tính số liệu;
+  * load generator chạy cùng máy nên chiếm CPU của server; số liệu trên máy
+    ít core bị nén lại.
+Cần cài thêm httpx (pip install httpx), chỉ dùng cho script này.
+
+Chưa có kết quả đo nào được ghi lại cho repo này; xem giới hạn khi chạy
+nhiều worker ở gunicorn.conf.py.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.cpu import available_cpus  # noqa: E402
+
+
+async def _load(url: str, headers: dict, concurrency: int, duration: float) -> list:
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(headers=headers, timeout=10) as client:
+        async def worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    resp = await client.get(url)
+                except httpx.HTTPError:
+                    continue
+                if resp.status_code < 500:
+                    latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def _wait_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=1) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(base_url + "/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.3)
+    raise RuntimeError("server did not become ready")
+
+
+def _start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "WEB_CONCURRENCY": str(workers),
+        "PORT": str(port),
+        "RATE_LIMIT_ENABLED": "0",
+        "CRYPTO_PRELOAD": "0",
+        "JOBS_LOCK_FILE": os.path.join(tempfile.gettempdir(), f"bench-jobs-{port}.lock"),
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for workers in range(1, args.max_workers + 1):
+        proc = _start_server(workers, args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            await _wait_ready(base_url)
+            await _load(base_url + args.path, headers, args.concurrency, args.warmup)
+            latencies = await _load(base_url + args.path, headers, args.concurrency, args.duration)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+        if not latencies:
+            print(f"{workers:>7} {'-':>10} {'-':>8} {'-':>8}")
+            continue
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{workers:>7} {len(latencies) / args.duration:>10.1f} "
+              f"{statistics.median(latencies) * 1000:>8.1f} {p99 * 1000:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=available_cpus())
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--token", default=os.getenv("BENCH_TOKEN"))
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
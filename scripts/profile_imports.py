@@ -0,0 +1,104 @@
+# scripts/profile_imports.py
+"""
+Đo thời gian import của app (python -X importtime) và in ra các module tốn
+thời gian nhất.
+
+    python scripts/profile_imports.py                 # top 20 theo cumulative
+    python scripts/profile_imports.py --top 40 --self # sắp xếp theo self time
+    python scripts/profile_imports.py --budget-ms 800 --forbid eth_account web3
+
+Với --budget-ms / --forbid script trả exit code 1 khi vượt ngân sách hoặc khi
+một module nặng bị import ngay lúc start, nên có thể chạy trong CI làm
+regression check cho cold start.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_importtime(target: str) -> list:
+    env = dict(os.environ)
+    # config.database yêu cầu 2 biến này lúc import; client Motor chỉ tạo khi dùng
+    env.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+    env.setdefault("MONGODB_DB_NAME", "import_profile")
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        raise SystemExit(f"❌ import {target} failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def total_ms(rows: list, target: str) -> float:
+    """Cumulative import time của target (ms)."""
+    return next(
+        (r["cumulative_us"] / 1000 for r in rows if r["module"] == target and r["depth"] == 0),
+        sum(r["self_us"] for r in rows) / 1000,
+    )
+
+
+def imported_packages(rows: list) -> set:
+    return {r["module"].split(".")[0] for r in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile app import time")
+    parser.add_argument("--target", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--self", dest="by_self", action="store_true", help="sort by self time")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if importing the target takes longer than this")
+    parser.add_argument("--forbid", nargs="*", default=[],
+                        help="fail if any of these top-level packages is imported at startup")
+    args = parser.parse_args()
+
+    rows = run_importtime(args.target)
+    key = "self_us" if args.by_self else "cumulative_us"
+
+    print(f"{'self ms':>10} {'cumul ms':>10}  module")
+    for r in sorted(rows, key=lambda r: r[key], reverse=True)[:args.top]:
+        print(f"{r['self_us'] / 1000:>10.1f} {r['cumulative_us'] / 1000:>10.1f}  {r['module']}")
+
+    elapsed_ms = total_ms(rows, args.target)
+    print(f"\n⏱  import {args.target}: {elapsed_ms:.1f} ms ({len(rows)} modules)")
+
+    failed = False
+
+    imported = imported_packages(rows)
+    for pkg in args.forbid:
+        if pkg in imported:
+            print(f"❌ {pkg} is imported at startup")
+            failed = True
+
+    if args.budget_ms is not None and elapsed_ms > args.budget_ms:
+        print(f"❌ import time {elapsed_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
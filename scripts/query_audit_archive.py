@@ -0,0 +1,49 @@
+# scripts/query_audit_archive.py
+"""
+Đọc audit log đã archive (jobs/audit_retention.py), giải nén dạng stream và
+in NDJSON ra stdout.
+
+    python scripts/query_audit_archive.py --since 2025-01-01 --until 2025-02-01
+    python scripts/query_audit_archive.py --user-id user_1 --action delete_task
+    python scripts/query_audit_archive.py --parts   # liệt kê các part trong index
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import audit_archive  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query archived audit logs")
+    parser.add_argument("--dir", default=None, help="archive dir (default: AUDIT_ARCHIVE_DIR)")
+    parser.add_argument("--since", default=None, help="created_at >= (ISO, inclusive)")
+    parser.add_argument("--until", default=None, help="created_at < (ISO, exclusive)")
+    parser.add_argument("--user-id", default=None)
+    parser.add_argument("--action", default=None)
+    parser.add_argument("--target-id", default=None)
+    parser.add_argument("--parts", action="store_true", help="list archive parts and exit")
+    args = parser.parse_args()
+
+    root = Path(args.dir) if args.dir else None
+
+    if args.parts:
+        for part in audit_archive.load_index(root)["parts"]:
+            print(f"{part['file']:<45} {part['count']:>8} rows {part['bytes']:>10} B  {part['status']}")
+        return
+
+    filters = {k: v for k, v in {
+        "user_id": args.user_id,
+        "action": args.action,
+        "target_id": args.target_id,
+    }.items() if v is not None}
+
+    for doc in audit_archive.iter_archived(args.since, args.until, filters, root):
+        sys.stdout.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# scripts/reset_stub_anchors.py
+"""
+One-off migration: undo the fake anchors written by the former stub
+ChainAnchor, which stored sha256("stub-anchor:<root>") as tx_hash and set
+verified_on_chain=True although nothing was submitted on-chain.
+
+Matching batches go back to status built (root and proofs are kept) and
+their verifications get tx_hash=None / verified_on_chain=False again, so
+the anchor job submits them for real once CHAIN_ANCHOR is configured.
+Idempotent.
+
+    python scripts/reset_stub_anchors.py [--dry-run]
+"""
+import argparse
+import asyncio
+import hashlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jobs.anchor_verifications import anchors_db, verifications_db  # noqa: E402
+
+
+def stub_tx_hash(root: str) -> str:
+    return "0x" + hashlib.sha256(f"stub-anchor:{root}".encode()).hexdigest()
+
+
+async def reset(dry_run: bool = False):
+    batch_ids = [
+        b["_id"]
+        async for b in anchors_db.find({"status": "submitted"}, {"_id": 1, "root": 1, "tx_hash": 1})
+        if b.get("tx_hash") == stub_tx_hash(b["root"])
+    ]
+    print(f"🔎 {len(batch_ids)} batch(es) anchored by the stub")
+
+    if dry_run or not batch_ids:
+        return
+
+    result = await verifications_db.update_many(
+        {"anchor_batch_id": {"$in": batch_ids}},
+        {"$set": {"tx_hash": None, "verified_on_chain": False}, "$unset": {"anchored_at": ""}},
+    )
+    await anchors_db.update_many(
+        {"_id": {"$in": batch_ids}, "status": "submitted"},
+        {"$set": {"status": "built"}, "$unset": {"tx_hash": "", "submitted_at": ""}},
+    )
+    print(f"✨ Reset {len(batch_ids)} batch(es), {result.modified_count} verification(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(reset(args.dry_run))
@@ -0,0 +1,61 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from middleware import compression
+from middleware.compression import CompressionMiddleware, negotiate
+
+
+@pytest.fixture
+def all_encodings(monkeypatch):
+    # Không phụ thuộc brotli / zstandard có được cài hay không
+    monkeypatch.setattr(compression, "PREFERENCE", ["br", "zstd", "gzip"])
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, zstd;q=0.8, gzip;q=0.8", "zstd"),
+    ("gzip; q=0.9, zstd;q=0.95", "zstd"),
+    ("br;q=abc, gzip", "gzip"),
+    ("*", "br"),
+    ("*;q=0.1, gzip;q=0.5", "gzip"),
+    ("br;q=0, *;q=0.2", "zstd"),
+    ("gzip;q=0, identity", None),
+    ("", None),
+])
+def test_negotiate_orders_by_q_then_preference(all_encodings, accept_encoding, expected):
+    assert negotiate(accept_encoding) == expected
+
+
+def test_negotiate_skips_missing_packages(monkeypatch):
+    monkeypatch.setattr(compression, "PREFERENCE", ["gzip"])
+    assert negotiate("br, zstd") is None
+    assert negotiate("br, gzip;q=0.1") == "gzip"
+
+
+def test_large_body_is_compressed_off_the_event_loop(monkeypatch):
+    offloaded = []
+
+    async def fake_threadpool(func, *args):
+        offloaded.append(len(args[0]))
+        return func(*args)
+
+    monkeypatch.setattr(compression, "run_in_threadpool", fake_threadpool)
+
+    app = FastAPI()
+
+    @app.get("/{size}")
+    async def body(size: int):
+        return PlainTextResponse("x" * size)
+
+    app.add_middleware(CompressionMiddleware, minimum_size=10, cache_bytes=0, thread_min_size=1000)
+
+    with TestClient(app) as client:
+        small = client.get("/100", headers={"Accept-Encoding": "gzip"})
+        large = client.get("/5000", headers={"Accept-Encoding": "gzip"})
+
+    assert small.headers["content-encoding"] == large.headers["content-encoding"] == "gzip"
+    assert large.text == "x" * 5000
+    assert offloaded == [5000]
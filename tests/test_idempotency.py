@@ -0,0 +1,70 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from middleware.idempotency import IdempotencyMiddleware  # noqa: E402
+from utils import idempotency  # noqa: E402
+from utils.jwt import create_access_token  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    collection = mongomock_motor.AsyncMongoMockClient()["tests"]["collection_idempotency_keys"]
+    monkeypatch.setattr(idempotency, "idempotency_db", collection)
+
+    calls = []
+    router = APIRouter(prefix="/tasks")
+
+    # Như routes/task_routes.py: route chỉ mount với dấu "/" ở cuối
+    @router.post("/")
+    async def create(payload: dict):
+        calls.append(payload)
+        return {"n": len(calls)}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(IdempotencyMiddleware)
+
+    with TestClient(app) as test_client:
+        test_client.calls = calls
+        yield test_client
+
+
+def _headers(key: str) -> dict:
+    return {
+        "Authorization": f"Bearer {create_access_token('user_1', '0xabc')}",
+        "Idempotency-Key": key,
+    }
+
+
+def test_retry_replays_first_response(client):
+    first = client.post("/tasks/", json={"title": "a"}, headers=_headers("k1"))
+    retry = client.post("/tasks/", json={"title": "a"}, headers=_headers("k1"))
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert len(client.calls) == 1
+
+
+def test_slash_redirect_is_not_stored(client):
+    # POST /tasks → 307 → POST /tasks/ với cùng key phải thực sự tạo task
+    response = client.post("/tasks", json={"title": "a"}, headers=_headers("k2"))
+
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+    assert len(client.calls) == 1
+
+    retry = client.post("/tasks", json={"title": "a"}, headers=_headers("k2"))
+    assert retry.json() == response.json()
+    assert len(client.calls) == 1
+
+
+def test_key_reused_with_different_body(client):
+    client.post("/tasks/", json={"title": "a"}, headers=_headers("k3"))
+    response = client.post("/tasks/", json={"title": "b"}, headers=_headers("k3"))
+
+    assert response.status_code == 422
+    assert len(client.calls) == 1
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from controllers import user_controller  # noqa: E402
+
+CHECKSUM_WALLET = "0xAbCdEf0123456789aBcDeF0123456789AbCdEf01"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = mongomock_motor.AsyncMongoMockClient()["tests"]
+    monkeypatch.setattr(user_controller, "group_members_db", database["collection_group_members"])
+    monkeypatch.setattr(user_controller, "groups_db", database["collection_groups"])
+    monkeypatch.setattr(user_controller, "tasks_db", database["collection_tasks"])
+    monkeypatch.setattr(user_controller, "_group_wallets", {})
+    user_controller.profile_cache.clear()
+    yield database
+    user_controller.profile_cache.clear()
+
+
+def _group_ids(result) -> list:
+    return [g["group_id"] for g in result[1]]
+
+
+def test_membership_change_evicts_checksum_cased_profile(db):
+    async def scenario():
+        await db["collection_groups"].insert_one({"group_id": "grp_1", "name": "g"})
+        assert _group_ids(await user_controller.get_profile_summary(CHECKSUM_WALLET)) == []
+
+        # join / add_member lưu và invalidate wallet chữ thường
+        await db["collection_group_members"].insert_one(
+            {"group_id": "grp_1", "wallet_address": CHECKSUM_WALLET.lower(), "role": "guest"}
+        )
+        user_controller.invalidate_profiles(CHECKSUM_WALLET.lower())
+        assert _group_ids(await user_controller.get_profile_summary(CHECKSUM_WALLET)) == ["grp_1"]
+
+        # remove_member
+        await db["collection_group_members"].delete_many({})
+        user_controller.invalidate_profiles(CHECKSUM_WALLET.lower())
+        assert _group_ids(await user_controller.get_profile_summary(CHECKSUM_WALLET)) == []
+
+    asyncio.run(scenario())
+
+
+def test_group_change_evicts_checksum_cased_profile(db):
+    async def scenario():
+        await db["collection_groups"].insert_one({"group_id": "grp_1", "name": "g"})
+        await db["collection_group_members"].insert_one(
+            {"group_id": "grp_1", "wallet_address": CHECKSUM_WALLET.lower(), "role": "member"}
+        )
+        summary, _, _ = await user_controller.get_profile_summary(CHECKSUM_WALLET)
+        assert summary["total_tasks"] == 0
+
+        await db["collection_tasks"].insert_one({"task_id": "t1", "group_id": "grp_1", "status": "pending"})
+        user_controller.invalidate_group_profiles("grp_1")
+        summary, _, _ = await user_controller.get_profile_summary(CHECKSUM_WALLET)
+        assert summary["total_tasks"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,19 @@
+import os
+
+from scripts.profile_imports import imported_packages, run_importtime, total_ms
+
+# Chạy trên máy dev ~1s; CI chậm hơn thì nới bằng STARTUP_BUDGET_MS
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "2500"))
+
+# utils/crypto.py chỉ import eth_account (kéo theo web3) khi cần lần đầu
+LAZY_PACKAGES = ("eth_account", "web3")
+
+
+def test_import_main_within_budget():
+    rows = run_importtime("main")
+
+    eager = imported_packages(rows) & set(LAZY_PACKAGES)
+    assert not eager, f"imported at startup: {sorted(eager)}"
+
+    elapsed_ms = total_ms(rows, "main")
+    assert elapsed_ms <= STARTUP_BUDGET_MS, f"import main took {elapsed_ms:.0f} ms"
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from utils.streaming import json_array_stream, prefetch
+
+
+class FakeCursor:
+    """Async cursor yielding `docs`, then raising `error` (if any)."""
+
+    def __init__(self, docs, error=None):
+        self.docs, self.error = list(docs), error
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.docs:
+            return self.docs.pop(0)
+        if self.error:
+            raise self.error
+        raise StopAsyncIteration
+
+
+def _app(cursor_factory) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items():
+        docs = await prefetch(cursor_factory())
+        return StreamingResponse(json_array_stream(docs), media_type="application/json")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("docs", [[], [{"a": 1}], [{"a": 1}, {"a": 2}, {"a": 3}]])
+def test_prefetch_replays_every_document(docs):
+    response = _app(lambda: FakeCursor(docs)).get("/items")
+
+    assert response.status_code == 200
+    assert response.json() == docs
+
+
+def test_error_on_first_batch_is_a_server_error():
+    response = _app(lambda: FakeCursor([], RuntimeError("connection refused"))).get("/items")
+
+    assert response.status_code == 500
+
+
+def test_prefetch_reads_first_document_before_streaming():
+    cursor = FakeCursor([{"a": 1}, {"a": 2}])
+
+    async def scenario():
+        docs = await prefetch(cursor)
+        assert cursor.docs == [{"a": 2}]
+        return [doc async for doc in docs]
+
+    assert asyncio.run(scenario()) == [{"a": 1}, {"a": 2}]
@@ -0,0 +1,204 @@
+# utils/audit_archive.py
+"""
+Archive file nén cho audit log đã hết hạn lưu trong Mongo.
+
+Layout (AUDIT_ARCHIVE_DIR):
+
+    index.json                                  # danh sách part + khoảng thời gian
+    2025/01/2025-01-03.000001.ndjson.gz         # 1 document / dòng
+    2025/01/2025-01-03.000002.ndjson.zst
+
+Mỗi part chỉ chứa log của một ngày (UTC). Nén bằng zstd nếu có package
+`zstandard`, không thì gzip; codec được ghi trong index nên đọc lẫn lộn cả
+hai loại vẫn được.
+
+Mọi hàm ở đây là I/O blocking (kể cả fsync); job gọi chúng qua
+asyncio.to_thread.
+"""
+import fcntl
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+
+from config.settings import AUDIT_ARCHIVE_DIR, AUDIT_ARCHIVE_CODEC
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+INDEX_FILE = "index.json"
+LOCK_FILE = ".lock"
+EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+
+class ArchiveUnavailable(RuntimeError):
+    """AUDIT_ARCHIVE_DIR chưa cấu hình hoặc không phải nơi lưu bền."""
+
+
+def archive_root() -> Path:
+    if not AUDIT_ARCHIVE_DIR:
+        raise ArchiveUnavailable("AUDIT_ARCHIVE_DIR is not set")
+    return Path(AUDIT_ARCHIVE_DIR)
+
+
+def check_archive_root(root: Path | None = None) -> Path:
+    """
+    Thư mục archive phải nằm trên disk bền (persistent disk / volume): đường
+    dẫn tuyệt đối, đã tồn tại và ghi được. Thư mục gốc không được tự tạo —
+    disk chưa mount thì mkdir sẽ ghi lên filesystem tạm của container.
+    """
+    root = root or archive_root()
+    if not root.is_absolute():
+        raise ArchiveUnavailable(f"AUDIT_ARCHIVE_DIR must be an absolute path: {root}")
+    if not root.is_dir():
+        raise ArchiveUnavailable(f"AUDIT_ARCHIVE_DIR does not exist (disk not mounted?): {root}")
+    if not os.access(root, os.W_OK):
+        raise ArchiveUnavailable(f"AUDIT_ARCHIVE_DIR is not writable: {root}")
+    return root
+
+
+def default_codec() -> str:
+    if AUDIT_ARCHIVE_CODEC == "gzip":
+        return "gzip"
+    if AUDIT_ARCHIVE_CODEC == "zstd" and zstandard is None:
+        raise RuntimeError("AUDIT_ARCHIVE_CODEC=zstd requires the zstandard package")
+    return "zstd" if zstandard is not None else "gzip"
+
+
+# ------------------------------------------------------------
+# INDEX
+# ------------------------------------------------------------
+
+def load_index(root: Path | None = None) -> dict:
+    path = (root or archive_root()) / INDEX_FILE
+    if not path.exists():
+        return {"parts": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_index(index: dict, root: Path | None = None):
+    """Ghi atomic: file tạm + fsync + rename."""
+    root = root or archive_root()
+    tmp = root / (INDEX_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, root / INDEX_FILE)
+
+
+def acquire_lock(root: Path | None = None):
+    """
+    Chỉ một process trên máy được ghi archive tại một thời điểm. Không chờ:
+    raise BlockingIOError nếu process khác đang giữ lock. Trả về file lock
+    để truyền cho release_lock().
+    """
+    root = root or archive_root()
+    f = open(root / LOCK_FILE, "w")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def release_lock(f):
+    try:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    finally:
+        f.close()
+
+
+# ------------------------------------------------------------
+# WRITE
+# ------------------------------------------------------------
+
+class PartWriter:
+    """
+    Write one day's part file. Data goes to a `.tmp` file that is fsynced
+    and renamed on close(), so a part listed in the index is always complete.
+    """
+
+    def __init__(self, day: str, seq: int, codec: str, root: Path | None = None):
+        self.root = root or archive_root()
+        self.codec = codec
+        year, month, _ = day.split("-")
+        self.relpath = f"{year}/{month}/{day}.{seq:06d}.ndjson.{EXTENSIONS[codec]}"
+        self.path = self.root / self.relpath
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._raw = open(str(self.path) + ".tmp", "wb")
+        if codec == "zstd":
+            self._stream = zstandard.ZstdCompressor(level=10).stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+
+    def write(self, data: bytes):
+        self._stream.write(data)
+
+    def close(self) -> int:
+        self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        size = self._raw.tell()
+        self._raw.close()
+        os.replace(str(self.path) + ".tmp", self.path)
+        return size
+
+    def abort(self):
+        try:
+            self._stream.close()
+        finally:
+            self._raw.close()
+            Path(str(self.path) + ".tmp").unlink(missing_ok=True)
+
+
+def next_seq(index: dict, day: str) -> int:
+    return max((p["seq"] for p in index["parts"] if p["day"] == day), default=0) + 1
+
+
+# ------------------------------------------------------------
+# READ
+# ------------------------------------------------------------
+
+def _open_part(path: Path, codec: str):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard to read it")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def iter_archived(since: str | None = None, until: str | None = None,
+                  filters: dict | None = None, root: Path | None = None):
+    """
+    Stream archived logs with since <= created_at < until, decompressing
+    one part at a time. Parts outside the range are skipped from the index
+    without being opened.
+    """
+    root = root or archive_root()
+    filters = filters or {}
+    parts = sorted(load_index(root)["parts"], key=lambda p: (p["day"], p["seq"]))
+
+    for part in parts:
+        if since and part["max_created_at"] < since:
+            continue
+        if until and part["min_created_at"] >= until:
+            continue
+
+        with _open_part(root / part["file"], part["codec"]) as lines:
+            for line in lines:
+                doc = json.loads(line)
+                created = doc.get("created_at") or ""
+                if since and created < since:
+                    continue
+                if until and created >= until:
+                    continue
+                if all(doc.get(k) == v for k, v in filters.items()):
+                    yield doc
@@ -0,0 +1,31 @@
+import os
+
+
+class ChainAnchor:
+    """Submits a Merkle root on-chain and returns the transaction hash."""
+
+    async def submit_root(self, root: str, leaf_count: int) -> str:
+        raise NotImplementedError
+
+
+# Backend → ChainAnchor; "stub" (mặc định) = chưa có contract, không submit
+BACKENDS: dict[str, type[ChainAnchor]] = {}
+
+_anchor: ChainAnchor | None = None
+
+
+def get_chain_anchor() -> ChainAnchor | None:
+    """
+    ChainAnchor đã cấu hình qua CHAIN_ANCHOR, hoặc None khi là "stub": khi
+    đó batch chỉ được build (root + proof) và chờ ở trạng thái built, không
+    ghi tx_hash / verified_on_chain giả lên verification.
+    """
+    global _anchor
+    if _anchor is None:
+        backend = os.getenv("CHAIN_ANCHOR", "stub")
+        if backend == "stub":
+            return None
+        if backend not in BACKENDS:
+            raise RuntimeError(f"Unknown CHAIN_ANCHOR backend: {backend}")
+        _anchor = BACKENDS[backend]()
+    return _anchor
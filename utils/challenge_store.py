@@ -0,0 +1,144 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+
+from config.settings import CHALLENGE_STORE, CHALLENGE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class ChallengeStore:
+    """
+    Storage for login nonces. `consume` must be atomic: a challenge can be
+    returned at most once, and never after it expired.
+    """
+
+    async def put(self, wallet_address: str, challenge: str, expires_at: datetime) -> None:
+        raise NotImplementedError
+
+    async def consume(self, wallet_address: str) -> str | None:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class InMemoryChallengeStore(ChallengeStore):
+    """
+    Single-process store: dict wallet -> (challenge, expiry) plus an expiry
+    heap drained by a background sweeper. Zero DB round trips; only valid
+    when one process serves all /auth requests.
+    """
+
+    def __init__(self, sweep_interval: float = 30):
+        self._challenges: dict[str, tuple[str, float]] = {}
+        self._expiry_heap: list[tuple[float, str, str]] = []
+        self._sweep_interval = sweep_interval
+        self._sweeper: asyncio.Task | None = None
+
+    @staticmethod
+    def _deadline(expires_at: datetime) -> float:
+        return time.monotonic() + (expires_at - datetime.utcnow()).total_seconds()
+
+    async def put(self, wallet_address: str, challenge: str, expires_at: datetime) -> None:
+        deadline = self._deadline(expires_at)
+        self._challenges[wallet_address] = (challenge, deadline)
+        heapq.heappush(self._expiry_heap, (deadline, wallet_address, challenge))
+
+    async def consume(self, wallet_address: str) -> str | None:
+        # pop không có await ở giữa → atomic trên event loop
+        entry = self._challenges.pop(wallet_address, None)
+        if entry is None:
+            return None
+        challenge, deadline = entry
+        if deadline < time.monotonic():
+            return None
+        return challenge
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] < now:
+            _, wallet_address, challenge = heapq.heappop(self._expiry_heap)
+            current = self._challenges.get(wallet_address)
+            # Chỉ xoá nếu wallet chưa xin challenge mới
+            if current and current[0] == challenge:
+                del self._challenges[wallet_address]
+                removed += 1
+        # Heap còn giữ entry của challenge đã consume/thay thế → rebuild khi phình to
+        if len(self._expiry_heap) > 2 * len(self._challenges) + 1024:
+            self._expiry_heap = [
+                (deadline, wallet, challenge)
+                for wallet, (challenge, deadline) in self._challenges.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+        return removed
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            self.sweep()
+
+    async def start(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever(), name="challenge-sweeper")
+
+    async def stop(self) -> None:
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+
+class MongoChallengeStore(ChallengeStore):
+    """
+    Shared store for multi-instance deployments. One upsert per challenge,
+    one find_one_and_delete per login; a TTL index on expires_at
+    (config/indexes.py) removes challenges that were never used.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def put(self, wallet_address: str, challenge: str, expires_at: datetime) -> None:
+        await self.collection.update_one(
+            {"wallet_address": wallet_address},
+            {"$set": {
+                "wallet_address": wallet_address,
+                "challenge": challenge,
+                "expires_at": expires_at,
+                "created_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+
+    async def consume(self, wallet_address: str) -> str | None:
+        record = await self.collection.find_one_and_delete({
+            "wallet_address": wallet_address,
+            "expires_at": {"$gt": datetime.utcnow()},
+        })
+        return record["challenge"] if record else None
+
+
+_store: ChallengeStore | None = None
+
+
+def get_challenge_store() -> ChallengeStore:
+    global _store
+    if _store is None:
+        if CHALLENGE_STORE == "memory":
+            _store = InMemoryChallengeStore()
+        else:
+            from config.database import get_collection
+            _store = MongoChallengeStore(get_collection("collection_auth_challenges"))
+        logger.info(f"Using {type(_store).__name__} for auth challenges")
+    return _store
+
+
+def challenge_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=CHALLENGE_TTL_SECONDS)
@@ -1,14 +1,52 @@
-from eth_account import Account
-from eth_account.messages import encode_defunct
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# eth_account kéo theo cả stack web3 (~1s import) nên chỉ load khi cần lần đầu
+_eth = None
+_eth_lock = threading.Lock()
+
+
+def _load_eth():
+    global _eth
+    if _eth is None:
+        with _eth_lock:
+            if _eth is None:
+                from eth_account import Account
+                from eth_account.messages import encode_defunct
+                _eth = (Account, encode_defunct)
+    return _eth
+
+
+def preload():
+    """
+    Warm up the eth_account import off the request path (called from a
+    background thread once the server is up).
+    """
+    try:
+        _load_eth()
+    except Exception as e:
+        logger.warning(f"Crypto preload error: {e}")
+
 
 def verify_signature(wallet_address: str, challenge: str, signature: str) -> bool:
     """
     Verify signature from MetaMask
     """
     try:
+        Account, encode_defunct = _load_eth()
         message = encode_defunct(text=challenge)
         recovered_address = Account.recover_message(message, signature=signature)
         return recovered_address.lower() == wallet_address.lower()
     except Exception as e:
-        print("Verify error:", e)
+        logger.debug(f"Verify error: {e}")
         return False
+
+
+def verify_signatures(items: list) -> list:
+    """
+    Batch form of verify_signature for process pools: items are
+    (wallet_address, message, signature) tuples.
+    """
+    return [verify_signature(wallet, message, signature) for wallet, message, signature in items]
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from config.settings import SSE_QUEUE_SIZE
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EventBroker:
+    """
+    Transport between publishers and the hubs of every worker. A shared
+    implementation (Redis pub/sub, Mongo change streams, ...) lets events
+    written on one worker reach subscribers connected to another.
+    """
+
+    async def publish(self, channel: str, event: dict) -> None:
+        raise NotImplementedError
+
+    async def start(self, deliver: Callable[[str, dict], Awaitable[None]]) -> None:
+        """Begin delivering every published event to `deliver`."""
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+
+class InMemoryBroker(EventBroker):
+    """Single-node broker: publish delivers straight to the local hub."""
+
+    def __init__(self):
+        self._deliver = None
+
+    async def start(self, deliver):
+        self._deliver = deliver
+
+    async def publish(self, channel, event):
+        if self._deliver:
+            await self._deliver(channel, event)
+
+
+class Subscriber:
+    """
+    Bounded per-connection buffer. Events with the same key (e.g. repeated
+    updates of one task) coalesce into the latest one; if the buffer still
+    overflows, it is dropped and the client is told to resync.
+    """
+
+    def __init__(self, maxsize: int = SSE_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._events: "OrderedDict[str, dict]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+
+    def push(self, event: dict):
+        key = event.get("key") or str(id(event))
+        if key in self._events:
+            del self._events[key]
+            metrics.inc("sse_events_coalesced")
+        self._events[key] = event
+        if len(self._events) > self.maxsize:
+            self._events.clear()
+            self.overflowed = True
+            metrics.inc("sse_subscriber_overflow")
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list | None:
+        """Wait up to `timeout` seconds; None means nothing arrived (send a heartbeat)."""
+        if not self._events and not self.overflowed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        if self.overflowed:
+            self.overflowed = False
+            self._events.clear()
+            return [{"type": "resync"}]
+
+        batch = list(self._events.values())
+        self._events.clear()
+        return batch
+
+
+class EventHub:
+    def __init__(self, broker: EventBroker | None = None):
+        self.broker = broker or InMemoryBroker()
+        self._subscribers: dict[str, set[Subscriber]] = {}
+
+    async def start(self):
+        await self.broker.start(self._deliver)
+
+    async def stop(self):
+        await self.broker.stop()
+
+    async def _deliver(self, channel: str, event: dict):
+        for subscriber in list(self._subscribers.get(channel, ())):
+            subscriber.push(event)
+
+    async def publish(self, channel: str, event: dict):
+        # Không để lỗi broadcast làm hỏng request ghi dữ liệu
+        try:
+            await self.broker.publish(channel, event)
+            metrics.inc("sse_events_published")
+        except Exception:
+            logger.exception(f"Failed to publish event on {channel}")
+
+    def subscribe(self, channel: str) -> Subscriber:
+        subscriber = Subscriber()
+        self._subscribers.setdefault(channel, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, channel: str, subscriber: Subscriber):
+        subscribers = self._subscribers.get(channel)
+        if subscribers:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[channel]
+
+
+event_hub = EventHub()
+
+
+def group_channel(group_id: str) -> str:
+    return f"group:{group_id}"
+
+
+async def sse_stream(request, channel: str, heartbeat: float):
+    """Server-Sent Events for one connection; heartbeat comments keep proxies from closing it."""
+    from utils.streaming import dumps
+
+    subscriber = event_hub.subscribe(channel)
+    metrics.inc("sse_connections_opened")
+    try:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            batch = await subscriber.next_batch(heartbeat)
+            if batch is None:
+                yield ": ping\n\n"
+                continue
+            for event in batch:
+                yield f"event: {event['type']}\ndata: {dumps(event)}\n\n"
+    finally:
+        event_hub.unsubscribe(channel, subscriber)
+        metrics.inc("sse_connections_closed")
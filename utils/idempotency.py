@@ -0,0 +1,178 @@
+# utils/idempotency.py
+"""
+Lưu response đầu tiên của mỗi Idempotency-Key để request retry được trả lại
+đúng response đó thay vì ghi thêm một bản ghi trùng.
+
+Ba tầng, theo thứ tự tra:
+  1. cache in-memory (TTLCache) các response đã xong — retry tốn 0 round trip;
+  2. future của request đang chạy trong cùng process — duplicate đồng thời
+     chờ kết quả thay vì chạy lần hai;
+  3. collection_idempotency_keys (TTL index trên expires_at) — dùng chung
+     giữa các worker; claim key bằng đúng một find_one_and_update(upsert).
+"""
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+
+from config.database import get_collection
+from config.settings import (
+    IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_LEASE_SECONDS, IDEMPOTENCY_WAIT_SECONDS,
+)
+from utils.metrics import metrics
+from utils.ttl_cache import TTLCache
+
+idempotency_db = get_collection("collection_idempotency_keys")
+
+POLL_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status: int
+    headers: list
+    body: bytes
+
+
+class IdempotencyConflict(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def fingerprint(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _check(stored: StoredResponse, request_fingerprint: str) -> StoredResponse:
+    if stored.fingerprint != request_fingerprint:
+        metrics.inc("idempotency", result="mismatch")
+        raise IdempotencyConflict(422, "Idempotency-Key was already used with a different request")
+    return stored
+
+
+def _from_doc(doc: dict) -> StoredResponse:
+    return StoredResponse(
+        fingerprint=doc["fingerprint"],
+        status=doc["status_code"],
+        headers=[tuple(h) for h in doc.get("headers", [])],
+        body=bytes(doc["body"]),
+    )
+
+
+class IdempotencyStore:
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, cache_size: int = IDEMPOTENCY_CACHE_SIZE):
+        self.ttl = ttl
+        self._cache = TTLCache(ttl, maxsize=cache_size)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def begin(self, key: str, request_fingerprint: str) -> StoredResponse | None:
+        """
+        None: caller sở hữu key, phải gọi complete() hoặc abort().
+        StoredResponse: response đã lưu, trả lại cho client.
+        """
+        while True:
+            cached = self._cache.get(key)
+            if cached is not None:
+                metrics.inc("idempotency", result="replay_cache")
+                return _check(cached, request_fingerprint)
+
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                break
+            metrics.inc("idempotency", result="wait_local")
+            # Owner xong (cache có response) hoặc abort (lặp lại để claim)
+            await asyncio.shield(waiting)
+
+        # Đăng ký future trước khi await để request cùng key trong process này chờ
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            stored = await self._claim(key, request_fingerprint)
+        except BaseException:
+            self._release(key)
+            raise
+        if stored is not None:
+            self._cache.set(key, stored)
+            self._release(key)
+            return _check(stored, request_fingerprint)
+        metrics.inc("idempotency", result="executed")
+        return None
+
+    async def _claim(self, key: str, request_fingerprint: str) -> StoredResponse | None:
+        deadline = asyncio.get_running_loop().time() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            now = datetime.utcnow()
+            existing = await idempotency_db.find_one_and_update(
+                {"_id": key},
+                {"$setOnInsert": {
+                    "status": "in_progress",
+                    "fingerprint": request_fingerprint,
+                    "lease_until": now + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS),
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl),
+                }},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+            if existing is None:
+                return None
+            if existing["status"] == "done":
+                metrics.inc("idempotency", result="replay_db")
+                return _from_doc(existing)
+
+            # Worker khác đang xử lý key này; lease hết hạn = owner đã chết → tiếp quản
+            if existing["lease_until"] < now:
+                taken = await idempotency_db.find_one_and_update(
+                    {"_id": key, "status": "in_progress", "lease_until": existing["lease_until"]},
+                    {"$set": {
+                        "fingerprint": request_fingerprint,
+                        "lease_until": now + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS),
+                    }},
+                    projection={"_id": 1},
+                    return_document=ReturnDocument.AFTER,
+                )
+                if taken is not None:
+                    metrics.inc("idempotency", result="lease_takeover")
+                    return None
+
+            if asyncio.get_running_loop().time() >= deadline:
+                metrics.inc("idempotency", result="in_progress")
+                raise IdempotencyConflict(409, "A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def complete(self, key: str, response: StoredResponse):
+        now = datetime.utcnow()
+        try:
+            await idempotency_db.update_one(
+                {"_id": key},
+                {"$set": {
+                    "status": "done",
+                    "fingerprint": response.fingerprint,
+                    "status_code": response.status,
+                    "headers": [list(h) for h in response.headers],
+                    "body": response.body,
+                    "expires_at": now + timedelta(seconds=self.ttl),
+                }},
+            )
+        finally:
+            self._cache.set(key, response)
+            self._release(key)
+
+    async def abort(self, key: str):
+        """Request lỗi (5xx / exception): xoá key để lần retry sau được chạy lại."""
+        try:
+            await idempotency_db.delete_one({"_id": key, "status": "in_progress"})
+        finally:
+            self._release(key)
+
+    def _release(self, key: str):
+        waiting = self._inflight.pop(key, None)
+        if waiting is not None and not waiting.done():
+            waiting.set_result(None)
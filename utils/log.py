@@ -0,0 +1,163 @@
+# utils/log.py
+"""
+Logging pipeline trên loguru.
+
+* Mọi module vẫn dùng `logging.getLogger(__name__)`; InterceptHandler chuyển
+  record của stdlib (kể cả uvicorn) sang loguru.
+* Sink chạy với enqueue=True: request path chỉ đẩy record vào queue, một
+  thread nền ghi ra stdout, không có I/O đồng bộ trên event loop.
+* Output JSON một dòng / record (LOG_FORMAT=json, hoặc text) kèm request_id
+  của request đang xử lý.
+* Level / sampling theo logger (prefix tên module) qua env:
+
+      LOG_LEVEL=INFO
+      LOG_LEVELS=controllers.group_member_controller=DEBUG,uvicorn.access=WARNING
+      LOG_SAMPLING=uvicorn.access=0.1,controllers.auth_controller=0.5
+
+  Sampling chỉ áp dụng cho record dưới WARNING; warning / error luôn được ghi.
+* shutdown_logging() chờ queue ghi hết trước khi process thoát.
+"""
+import contextvars
+import json
+import logging
+import random
+import sys
+import traceback
+from functools import lru_cache
+
+from loguru import logger
+
+from config.settings import LOG_LEVEL, LOG_LEVELS, LOG_SAMPLING, LOG_FORMAT
+
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+# Logger của thư viện cũng đi qua pipeline (handler riêng của chúng bị gỡ)
+INTERCEPTED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "fastapi")
+
+TEXT_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {extra[request_id]} | "
+    "{name}:{line} - {message}"
+)
+
+_handler_id = None
+
+
+def _parse_mapping(raw: str, cast) -> dict:
+    """"a=1,b.c=2" → {"a": cast("1"), "b.c": cast("2")}"""
+    result = {}
+    for item in raw.split(","):
+        name, sep, value = item.partition("=")
+        if sep and name.strip():
+            result[name.strip()] = cast(value.strip())
+    return result
+
+
+def _level_no(name: str) -> int:
+    return logger.level(name.upper()).no
+
+
+_levels = {name: _level_no(level) for name, level in _parse_mapping(LOG_LEVELS, str).items()}
+_sampling = _parse_mapping(LOG_SAMPLING, float)
+_default_level = _level_no(LOG_LEVEL)
+
+
+def _lookup(name: str, table: dict, default):
+    """Giá trị của prefix dài nhất khớp `name` ("jobs" khớp "jobs.scheduler")."""
+    while name:
+        if name in table:
+            return table[name]
+        name = name.rpartition(".")[0]
+    return default
+
+
+@lru_cache(maxsize=1024)
+def _rules(name: str) -> tuple:
+    return _lookup(name, _levels, _default_level), _lookup(name, _sampling, 1.0)
+
+
+def _filter(record) -> bool:
+    min_level, rate = _rules(record["name"] or "")
+    level = record["level"].no
+    if level < min_level:
+        return False
+    if rate < 1.0 and level < logging.WARNING:
+        return random.random() < rate
+    return True
+
+
+def _json_format(record) -> str:
+    # Serialize ở thread gọi log (sau filter), thread nền chỉ còn ghi chuỗi
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+        "request_id": record["extra"].get("request_id"),
+        "process": record["process"].id,
+    }
+    if record["exception"] is not None:
+        payload["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    record["extra"]["_json"] = json.dumps(payload, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+def _patch(record):
+    # Chạy ở thread / task gọi log, trước khi record vào queue
+    if record["extra"].get("request_id") is None:
+        record["extra"]["request_id"] = request_id_var.get()
+
+
+class InterceptHandler(logging.Handler):
+    """Chuyển record của logging (stdlib) sang loguru, giữ tên logger gốc."""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        logger.patch(lambda r: r.update(name=record.name, function=record.funcName, line=record.lineno)) \
+            .opt(exception=record.exc_info) \
+            .log(level, record.getMessage())
+
+
+def setup_logging():
+    """
+    Gọi một lần trong mỗi process (lifespan của worker): thread ghi của
+    enqueue không sống sót qua fork nên không cấu hình ở master.
+    """
+    global _handler_id
+    if _handler_id is not None:
+        return
+
+    logger.remove()
+    logger.configure(patcher=_patch, extra={"request_id": None})
+    _handler_id = logger.add(
+        sys.stdout,
+        level=0,
+        filter=_filter,
+        format=_json_format if LOG_FORMAT == "json" else TEXT_FORMAT,
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
+    )
+
+    # Chặn record ngay ở stdlib nếu không logger nào cần level đó
+    min_level = min([_default_level, *_levels.values()])
+    logging.basicConfig(handlers=[InterceptHandler()], level=min_level, force=True)
+    for name in INTERCEPTED_LOGGERS:
+        std_logger = logging.getLogger(name)
+        std_logger.handlers = []
+        std_logger.propagate = True
+
+
+async def shutdown_logging():
+    """Ghi hết record còn trong queue rồi dừng thread ghi (không mất log lúc tắt)."""
+    global _handler_id
+    if _handler_id is None:
+        return
+    await logger.complete()
+    logger.remove(_handler_id)
+    _handler_id = None
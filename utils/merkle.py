@@ -0,0 +1,56 @@
+import hashlib
+import json
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(task_id: str, wallet_address: str, message: str, signature: str) -> str:
+    """Canonical hash of one verification (hex)."""
+    canonical = json.dumps(
+        [task_id, (wallet_address or "").lower(), message, signature.lower()],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    return hashlib.sha256(LEAF_PREFIX + canonical).hexdigest()
+
+
+def _node_hash(a: str, b: str) -> str:
+    # Cặp được sort → proof không cần lưu vị trí trái/phải
+    lo, hi = sorted((a, b))
+    return hashlib.sha256(NODE_PREFIX + bytes.fromhex(lo) + bytes.fromhex(hi)).hexdigest()
+
+
+def build_tree(leaves: list) -> list:
+    """
+    Return all levels, leaves first and root last. An odd node at the end
+    of a level is carried up unchanged.
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parent.append(level[-1])
+        levels.append(parent)
+    return levels
+
+
+def proof(levels: list, index: int) -> list:
+    """Sibling hashes from leaf `index` up to the root."""
+    path = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(level[sibling])
+        index //= 2
+    return path
+
+
+def verify_proof(leaf: str, path: list, root: str) -> bool:
+    node = leaf
+    for sibling in path:
+        node = _node_hash(node, sibling)
+    return node == root
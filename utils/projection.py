@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter, create_model
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> tuple | None:
+    """
+    `?fields=title,status` → ("status", "title"), validated against the
+    response model. None / empty means "all fields".
+    """
+    if not fields:
+        return None
+    names = tuple(sorted({f.strip() for f in fields.split(",") if f.strip()}))
+    unknown = [f for f in names if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(400, f"Unknown field(s): {', '.join(unknown)}")
+    return names or None
+
+
+def mongo_projection(fields: tuple | None, base: dict | None = None) -> dict | None:
+    """Projection đẩy xuống find()/aggregate; `base` là projection mặc định khi không chọn field."""
+    if fields is None:
+        return base
+    return {"_id": 0, **{f: 1 for f in fields}}
+
+
+@lru_cache(maxsize=256)
+def partial_model(model: type[BaseModel], fields: tuple) -> type[BaseModel]:
+    """Response model chỉ gồm `fields` (đều optional), cache theo field set."""
+    definitions = {}
+    for name in fields:
+        info = model.model_fields[name]
+        definitions[name] = (Optional[info.annotation], None)
+    return create_model(f"{model.__name__}[{','.join(fields)}]", **definitions)
+
+
+@lru_cache(maxsize=256)
+def _adapter(model: type[BaseModel], fields: tuple, many: bool) -> TypeAdapter:
+    partial = partial_model(model, fields)
+    return TypeAdapter(list[partial] if many else partial)
+
+
+def projected_response(data, model: type[BaseModel], fields: tuple) -> Response:
+    """
+    Serialize `data` (a document or list of documents) through the reduced
+    model. Returned as a Response so FastAPI skips the full response_model.
+    """
+    adapter = _adapter(model, fields, isinstance(data, list))
+    return Response(adapter.dump_json(adapter.validate_python(data)), media_type="application/json")
@@ -0,0 +1,68 @@
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Token bucket: `capacity` burst, refilled at `per_second` tokens/s."""
+    capacity: float
+    per_second: float
+
+    @classmethod
+    def per_minute(cls, count: float, burst: float | None = None) -> "Limit":
+        return cls(capacity=burst or count, per_second=count / 60)
+
+
+class RateLimitBackend:
+    """
+    Storage for token buckets. A shared implementation (e.g. Redis with a
+    Lua script) can be plugged in for multi-instance deployments.
+    """
+
+    async def hit(self, key: str, limit: Limit) -> tuple[bool, float]:
+        """Take one token. Returns (allowed, retry_after_seconds)."""
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process buckets, sharded across N dicts with one lock each so
+    threadpool callers never contend on a single lock. Idle buckets (which
+    would be full anyway) are pruned when a shard grows past max_keys.
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10_000):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._max_keys = max_keys_per_shard
+
+    def _shard(self, key: str):
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    async def hit(self, key: str, limit: Limit) -> tuple[bool, float]:
+        buckets, lock = self._shard(key)
+        now = time.monotonic()
+
+        with lock:
+            tokens, last = buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - last) * limit.per_second)
+
+            if tokens >= 1:
+                buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / limit.per_second
+
+            if len(buckets) > self._max_keys:
+                self._prune(buckets, now)
+
+        return allowed, retry_after
+
+    @staticmethod
+    def _prune(buckets: dict, now: float):
+        # Bucket không được chạm tới trong 1 giờ chắc chắn đã đầy lại
+        stale = [k for k, (_, last) in buckets.items() if now - last > 3600]
+        for k in stale:
+            del buckets[k]
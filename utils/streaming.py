@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            return obj.isoformat() + "Z"
+        return obj.isoformat().replace("+00:00", "Z")
+    return str(obj)
+
+
+def dumps(doc: dict) -> str:
+    return json.dumps(doc, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+_EMPTY = object()
+
+
+async def prefetch(cursor):
+    """
+    Await the cursor's first batch before the response starts, so query /
+    connection errors still surface as a proper 5xx instead of a 200 with a
+    truncated body. Returns an async iterator over all documents. An error
+    after this point aborts the connection mid-body.
+    """
+    docs = cursor.__aiter__()
+    try:
+        first = await docs.__anext__()
+    except StopAsyncIteration:
+        first = _EMPTY
+
+    async def replay():
+        if first is _EMPTY:
+            return
+        yield first
+        async for doc in docs:
+            yield doc
+
+    return replay()
+
+
+async def json_array_stream(cursor):
+    """
+    Encode a Motor cursor (or prefetch() iterator) as a JSON array one
+    document at a time, so the response never holds the full result set in
+    memory.
+    """
+    yield "["
+    first = True
+    async for doc in cursor:
+        if first:
+            first = False
+            yield dumps(doc)
+        else:
+            yield "," + dumps(doc)
+    yield "]"
+
+
+async def ndjson_stream(cursor):
+    """One JSON document per line, straight from the cursor."""
+    async for doc in cursor:
+        yield dumps(doc) + "\n"
+
+
+def _flatten(doc: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in doc.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, list):
+            flat[name] = ";".join(str(v) for v in value)
+        elif isinstance(value, datetime):
+            flat[name] = _json_default(value)
+        else:
+            flat[name] = value
+    return flat
+
+
+async def csv_stream(cursor, columns: list, rows_per_chunk: int = 200):
+    """
+    CSV with a fixed header. Nested dicts (e.g. metadata) are flattened to
+    dotted columns and lists are joined with ';'. Rows are buffered in small
+    chunks so memory stays flat regardless of result size.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+
+    rows = 0
+    async for doc in cursor:
+        writer.writerow(_flatten(doc))
+        rows += 1
+        if rows % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+async def gzip_stream(chunks, level: int = 6):
+    """Incrementally gzip an async stream of str chunks."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
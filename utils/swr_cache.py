@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SWRCache:
+    """
+    In-process stale-while-revalidate cache for async loaders.
+
+    - fresh (age < ttl): served from memory
+    - stale (age < ttl + stale_ttl): served from memory while one background
+      refresh runs
+    - miss / expired: concurrent callers await a single shared load
+
+    invalidate() drops the entry and detaches any in-flight load, so a
+    result computed before a write is never stored after it.
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._hits = 0
+        self._requests = 0
+
+    def _record(self, result: str):
+        self._requests += 1
+        if result != "miss":
+            self._hits += 1
+        metrics.inc(f"{self.name}_requests", result=result)
+        metrics.gauge(f"{self.name}_hit_ratio", self._hits / self._requests)
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if self.ttl <= 0:
+            return await loader()
+
+        entry = self._data.get(key)
+        if entry is not None:
+            fetched_at, value = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self._data.move_to_end(key)
+                self._record("hit")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._record("stale")
+                self._refresh(key, loader)
+                return value
+
+        self._record("miss")
+        # shield: một caller bị cancel không huỷ load mà caller khác đang chờ
+        return await asyncio.shield(self._refresh(key, loader))
+
+    def _refresh(self, key: Hashable, loader) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            task.add_done_callback(self._log_failure)
+            self._inflight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, loader):
+        me = asyncio.current_task()
+        started = time.perf_counter()
+        try:
+            value = await loader()
+        finally:
+            metrics.observe(f"{self.name}_refresh_seconds", time.perf_counter() - started)
+            current = self._inflight.get(key) is me
+            if current:
+                self._inflight.pop(key, None)
+
+        # Bị invalidate trong lúc load → kết quả có thể đã cũ, không lưu
+        if current:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def _log_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            metrics.inc(f"{self.name}_refresh_errors")
+            logger.warning(f"{self.name} refresh failed: {task.exception()!r}")
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._inflight.clear()
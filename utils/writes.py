@@ -0,0 +1,56 @@
+# utils/writes.py
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+
+def _combine(query: dict, allowed: dict) -> dict:
+    if query.keys() & allowed.keys():
+        return {"$and": [query, allowed]}
+    return {**query, **allowed}
+
+
+async def update_if_allowed(
+    collection,
+    query: dict,
+    allowed: dict,
+    update: dict,
+    *,
+    not_found: str = "Not found",
+    forbidden: str = "You don't have permission to perform this action",
+    recheck: Callable[[dict], Awaitable[None]] | None = None,
+    projection: dict | None = None,
+    probe_projection: dict | None = None,
+) -> dict:
+    """
+    Update có kiểm tra quyền trong một round trip: `allowed` (điều kiện sở
+    hữu / quyền) được ghép vào filter của find_one_and_update và trả về
+    document sau khi ghi.
+
+    Chỉ khi filter không khớp mới đọc thêm một lần (probe theo `query`) để
+    phân biệt 404 với 403 (chỉ đọc các field trong `probe_projection`,
+    mặc định _id). `recheck(doc)` dùng khi `allowed` được dựng từ
+    cache có thể đã cũ: nó raise nếu đúng là không có quyền, còn không thì
+    ghi lại theo `query`.
+    """
+    doc = await collection.find_one_and_update(
+        _combine(query, allowed), update,
+        projection=projection, return_document=ReturnDocument.AFTER,
+    )
+    if doc is not None:
+        return doc
+
+    current = await collection.find_one(query, probe_projection or {"_id": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    if recheck is None:
+        raise HTTPException(status_code=403, detail=forbidden)
+
+    await recheck(current)
+    doc = await collection.find_one_and_update(
+        query, update, projection=projection, return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return doc